@@ -2,7 +2,20 @@ import cv2
 import mediapipe as mp
 import pygame
 import numpy as np
+import argparse
+import colorsys
+import random
+import threading
+import time
+from collections import defaultdict
 from enum import Enum
+from capture import LatestFrameCapture
+
+RENDER_FPS = 60        # 遊戲畫面更新率（與手勢辨識速度無關）
+REFERENCE_RATE = 30    # 原本每次辨識移動一次，以每秒 30 次辨識換算成每秒速度
+HAND_TIMEOUT = 0.3     # 超過此秒數沒有新的手部資料時停止移動
+DAMAGE_PER_SECOND = 30 # 攻擊命中時每秒扣的血量
+ATTACK_RANGE = 100     # 攻擊距離（像素，水平）
 
 class PlayerState(Enum):
     IDLE = 1
@@ -13,9 +26,39 @@ class Direction(Enum):
     LEFT = -1
     RIGHT = 1
 
+BACKGROUND_COLOR = (255, 255, 255)
+HEALTH_BAR_OFFSET = 20  # 血條在角色上方的距離
+
+# 角色圖像快取：(大小, 顏色, 狀態, 方向) -> Surface，只在第一次用到時繪製
+_sprite_cache = {}
+
+def player_sprite(size, color, state, direction):
+    """取得角色本體與方向指示器的圖像（快取）"""
+    key = (size, color, state, direction)
+    sprite = _sprite_cache.get(key)
+    if sprite is None:
+        width, height = size
+        sprite = pygame.Surface(size)
+        sprite.fill(color)
+        # 防禦時加上外框
+        if state == PlayerState.DEFENSE:
+            pygame.draw.rect(sprite, (0, 0, 255), sprite.get_rect(), 3)
+        # 繪製方向指示器（三角形）
+        cy = height // 2
+        if direction == Direction.RIGHT:
+            direction_indicator = [(width, cy), (width - 10, cy - 10), (width - 10, cy + 10)]
+        else:
+            direction_indicator = [(0, cy), (10, cy - 10), (10, cy + 10)]
+        pygame.draw.polygon(sprite, (255, 255, 0), direction_indicator)
+        sprite = sprite.convert() if pygame.display.get_surface() else sprite
+        _sprite_cache[key] = sprite
+    return sprite
+
 class Player:
-    def __init__(self, x, y, width, height, color, is_left_player=True):
+    def __init__(self, x, y, width, height, color, is_left_player=True, bounds=None):
         self.rect = pygame.Rect(x, y, width, height)
+        self.bounds = bounds  # 可移動的範圍（預設為整個視窗，第一次移動時取得）
+        self.x, self.y = float(x), float(y)  # 實際位置（小數），每幀移動量可能小於 1 像素
         self.color = color
         self.state = PlayerState.IDLE
         self.health = 100
@@ -23,20 +66,29 @@ class Player:
         self.is_left_player = is_left_player
         self.direction = Direction.RIGHT if is_left_player else Direction.LEFT
         self.y_speed = 5
+        # 手勢控制的速度（像素 / 秒）：每次辨識更新目標速度，畫面更新時在兩次辨識之間內插
+        self.velocity = (0.0, 0.0)
+        self.start_velocity = (0.0, 0.0)
+        self.target_velocity = (0.0, 0.0)
+        self.command_time = None
+        self.command_interval = 1 / REFERENCE_RATE
 
     def move(self, dx, dy):
         # 水平移動
-        self.rect.x += dx
+        self.x += dx
         if dx > 0:
             self.direction = Direction.RIGHT
         elif dx < 0:
             self.direction = Direction.LEFT
 
         # 垂直移動
-        self.rect.y += dy
-        
+        self.y += dy
+        self.rect.x, self.rect.y = round(self.x), round(self.y)
+
         # 確保玩家不會超出畫面
-        screen = pygame.display.get_surface().get_rect()
+        if self.bounds is None:
+            self.bounds = pygame.display.get_surface().get_rect()
+        screen = self.bounds
         # 限制水平移動
         if self.rect.left < screen.left:
             self.rect.left = screen.left
@@ -47,33 +99,34 @@ class Player:
             self.rect.top = screen.top
         if self.rect.bottom > screen.bottom:
             self.rect.bottom = screen.bottom
+        # 被畫面邊界擋住時同步小數位置
+        if self.rect.x != round(self.x):
+            self.x = float(self.rect.x)
+        if self.rect.y != round(self.y):
+            self.y = float(self.rect.y)
+
+    def health_width(self):
+        return max(int(self.rect.width * (self.health / 100)), 0)
+
+    def draw_rect(self):
+        """角色與血條佔用的範圍"""
+        return pygame.Rect(self.rect.x, self.rect.y - HEALTH_BAR_OFFSET,
+                           self.rect.width, self.rect.height + HEALTH_BAR_OFFSET)
+
+    def appearance(self):
+        """決定畫面內容的所有狀態，與上一幀相同時不必重畫"""
+        return self.rect.topleft, self.state, self.direction, self.health_width()
 
     def draw(self, surface):
-        # 繪製角色
-        pygame.draw.rect(surface, self.color, self.rect)
-        
-        # 繪製方向指示器（三角形）
-        direction_indicator = []
-        if self.direction == Direction.RIGHT:
-            direction_indicator = [
-                (self.rect.right, self.rect.centery),
-                (self.rect.right - 10, self.rect.centery - 10),
-                (self.rect.right - 10, self.rect.centery + 10)
-            ]
-        else:
-            direction_indicator = [
-                (self.rect.left, self.rect.centery),
-                (self.rect.left + 10, self.rect.centery - 10),
-                (self.rect.left + 10, self.rect.centery + 10)
-            ]
-        pygame.draw.polygon(surface, (255, 255, 0), direction_indicator)
+        # 繪製角色（快取的圖像）
+        surface.blit(player_sprite(self.rect.size, self.color, self.state, self.direction), self.rect)
         
         # 繪製血條
-        health_bar = pygame.Rect(self.rect.x, self.rect.y - 20, 
-                               self.rect.width * (self.health/100), 10)
-        pygame.draw.rect(surface, (255, 0, 0), health_bar)
+        health_bar = pygame.Rect(self.rect.x, self.rect.y - HEALTH_BAR_OFFSET, self.health_width(), 10)
+        surface.fill((255, 0, 0), health_bar)
+        return self.draw_rect()
 
-    def update_from_hand(self, hand_landmarks, is_left_hand):
+    def update_from_hand(self, hand_landmarks, is_left_hand, timestamp=None):
         # 確認這是否是對應的控制手
         if self.is_left_player != is_left_hand:
             return
@@ -82,33 +135,306 @@ class Player:
         hand_y = hand_landmarks.landmark[0].y
         hand_x = hand_landmarks.landmark[0].x
         
-        # 計算移動量
-        dx = (hand_x - 0.5) * self.speed * 10
-        dy = (hand_y - 0.5) * self.y_speed * 10
-        
-        # 更新位置和方向
-        self.move(dx, dy)
+        # 計算移動速度（實際移動在 update 中依經過時間進行）
+        vx = (hand_x - 0.5) * self.speed * 10 * REFERENCE_RATE
+        vy = (hand_y - 0.5) * self.y_speed * 10 * REFERENCE_RATE
+        self.set_velocity(vx, vy, time.perf_counter() if timestamp is None else timestamp)
+
+    def set_velocity(self, vx, vy, timestamp):
+        """設定新的目標速度，timestamp 為該次辨識的影像時間"""
+        if self.command_time is not None and timestamp > self.command_time:
+            self.command_interval = timestamp - self.command_time
+        self.start_velocity = self.velocity
+        self.target_velocity = (vx, vy)
+        self.command_time = timestamp
+
+    def update(self, dt, now):
+        """
+        每個畫面更新呼叫一次：在兩次辨識之間把速度由舊值線性內插到新值，
+        新的辨識結果還沒到時沿用目前速度外插，太久沒有資料時停止
+        """
+        if self.command_time is None:
+            return
+        elapsed = now - self.command_time
+        if elapsed > HAND_TIMEOUT:
+            self.velocity = (0.0, 0.0)
+            return
+        blend = min(elapsed / self.command_interval, 1.0)
+        (sx, sy), (tx, ty) = self.start_velocity, self.target_velocity
+        self.velocity = (sx + (tx - sx) * blend, sy + (ty - sy) * blend)
+        if self.velocity != (0.0, 0.0):
+            self.move(self.velocity[0] * dt, self.velocity[1] * dt)
+
+class Renderer:
+    """
+    只更新有變化的區域（dirty rect）
+    角色外觀（位置、狀態、方向、血量）與上一幀相同時不重畫；有變化時以背景蓋掉舊位置，
+    重畫與變化區域重疊的角色，最後只把這些區域送到螢幕
+    子母畫面（攝影機預覽）畫在最上層，有新影像或被變化區域蓋到時才重畫
+    與變化區域重疊的角色以空間雜湊查詢，不必逐一比對所有角色
+    """
+
+    def __init__(self, screen, background_color=BACKGROUND_COLOR, cell_size=ATTACK_RANGE):
+        self.screen = screen
+        self.grid = SpatialHash(cell_size, cell_size)
+        self.screen_rect = screen.get_rect()
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(background_color)
+        self.last = {}        # 角色 -> (外觀, 佔用範圍)
+        self.full = True      # 下一次整個畫面重畫
+        self.overlay = None   # (Surface, 位置)
+        self.overlay_dirty = False
+
+    def invalidate(self):
+        self.full = True
+
+    def set_overlay(self, surface, rect):
+        """設定子母畫面，rect 為在視窗中的位置"""
+        self.overlay = (surface, rect)
+        self.overlay_dirty = True
+
+    def render(self, players):
+        """繪製一幀，回傳更新的區域"""
+        dirty = []
+        for player in players:
+            appearance = player.appearance()
+            previous = self.last.get(player)
+            if previous is None or previous[0] != appearance or self.full:
+                rect = player.draw_rect()
+                dirty.append(rect)
+                if previous is not None:
+                    dirty.append(previous[1])
+                self.last[player] = (appearance, rect)
+
+        if self.full:
+            self.screen.blit(self.background, (0, 0))
+            for player in players:
+                player.draw(self.screen)
+            if self.overlay is not None:
+                self.screen.blit(*self.overlay)
+            pygame.display.flip()
+            self.full = self.overlay_dirty = False
+            return [self.screen_rect]
+        if not dirty and not self.overlay_dirty:
+            return []
+
+        for rect in dirty:
+            self.screen.blit(self.background, rect, rect)
+        if dirty:
+            # 依繪製範圍登記角色，只檢查變化區域所在格子裡的角色，並依原本的順序重畫
+            self.grid.clear()
+            for i, player in enumerate(players):
+                self.grid.insert((i, player), player.draw_rect())
+            redraw = {}
+            for rect in dirty:
+                for i, player in self.grid.query(rect):
+                    if i not in redraw and player.draw_rect().colliderect(rect):
+                        redraw[i] = player
+            for i in sorted(redraw):
+                redraw[i].draw(self.screen)
+        if self.overlay is not None:
+            surface, rect = self.overlay
+            if self.overlay_dirty or rect.collidelist(dirty) != -1:
+                self.screen.blit(surface, rect)
+                dirty.append(rect)
+            self.overlay_dirty = False
+        dirty = [rect.clip(self.screen_rect) for rect in dirty]
+        pygame.display.update(dirty)
+        return dirty
+
+class HandTracker:
+    """
+    背景執行緒做手部辨識
+    攝影機背景擷取只保留最新一幀，辨識完成後發布最新的結果 (版本, 影像時間, 影像, 辨識結果)，
+    遊戲迴圈不必等待辨識，可以固定以 60 fps 更新畫面
+    preview_size 不為 None 時發布的影像先在背景縮小成預覽大小（辨識仍使用原始影像）
+    """
+
+    def __init__(self, hands, src=0, preview_size=None):
+        self.hands = hands
+        self.preview_size = preview_size
+        self.cap = LatestFrameCapture(src)
+        self.lock = threading.Lock()
+        self.latest = (0, None, None, None)
+        self.running = False
+        self.thread = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        self.cap.start()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        version = 0
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                if not self.cap.running:
+                    break  # 攝影機已關閉
+                continue
+            timestamp = time.perf_counter()
+            frame = cv2.flip(frame, 1)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            results = self.hands.process(rgb_frame)
+            if self.preview_size is not None:
+                frame = cv2.resize(frame, self.preview_size, interpolation=cv2.INTER_AREA)
+            version += 1
+            with self.lock:
+                self.latest = (version, timestamp, frame, results)
+
+    def get(self):
+        """回傳最新的 (版本, 影像時間, 影像, 辨識結果)，版本不變表示沒有新結果"""
+        with self.lock:
+            return self.latest
+
+    def release(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.cap.release()
+
+class SpatialHash:
+    """
+    均勻網格空間雜湊
+    格子大小等於攻擊距離，距離內的角色一定在相鄰的格子中，只需檢查 3x3 格而不必兩兩比較
+    cell_height 為 None 時只依水平位置分格（不限制垂直距離）
+    """
+
+    def __init__(self, cell_width, cell_height=None):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = defaultdict(list)
+
+    def key(self, x, y):
+        return int(x // self.cell_width), (int(y // self.cell_height) if self.cell_height else 0)
+
+    def clear(self):
+        self.cells.clear()
+
+    def rebuild(self, players):
+        self.clear()
+        for player in players:
+            self.cells[self.key(player.rect.centerx, player.rect.centery)].append(player)
+
+    def cover(self, rect):
+        """rect 涵蓋的所有格子"""
+        x0, y0 = self.key(rect.left, rect.top)
+        x1, y1 = self.key(rect.right - 1, rect.bottom - 1)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    def insert(self, item, rect):
+        """把 item 登記到 rect 涵蓋的每一格"""
+        for cell in self.cover(rect):
+            self.cells[cell].append(item)
+
+    def query(self, rect):
+        """回傳登記在 rect 涵蓋的格子中的項目（可能重複，由呼叫端再精確比對）"""
+        for cell in self.cover(rect):
+            yield from self.cells.get(cell, ())
+
+    def nearby(self, player):
+        """回傳與 player 同格及相鄰格的角色（包含 player 自己）"""
+        cx, cy = self.key(player.rect.centerx, player.rect.centery)
+        rows = (-1, 0, 1) if self.cell_height else (0,)
+        for dx in (-1, 0, 1):
+            for dy in rows:
+                yield from self.cells.get((cx + dx, cy + dy), ())
+
+class Bot:
+    """
+    電腦角色：每隔一段時間朝附近的角色移動，距離夠近時攻擊，偶爾防禦
+    附近的角色由空間雜湊查詢，沒有時隨機走動
+    """
+
+    def __init__(self, player, rng=random, think_interval=0.1, speed=150):
+        self.player = player
+        self.rng = rng
+        self.think_interval = think_interval
+        self.speed = speed
+        self.next_think = 0.0
+
+    def update(self, now, grid):
+        if now < self.next_think:
+            return
+        self.next_think = now + self.think_interval * self.rng.uniform(0.5, 1.5)
+        me = self.player
+        targets = [p for p in grid.nearby(me) if p is not me]
+        if targets:
+            target = min(targets, key=lambda p: abs(p.rect.centerx - me.rect.centerx))
+            dx = target.rect.centerx - me.rect.centerx
+            dy = target.rect.centery - me.rect.centery
+            if abs(dx) < ATTACK_RANGE * 0.6:
+                me.state = PlayerState.DEFENSE if self.rng.random() < 0.3 else PlayerState.ATTACK
+                dx = dy = 0
+            else:
+                me.state = PlayerState.IDLE
+            norm = max((dx * dx + dy * dy) ** 0.5, 1e-6)
+            vx, vy = dx / norm * self.speed, dy / norm * self.speed
+        else:
+            me.state = PlayerState.IDLE
+            vx, vy = self.rng.uniform(-1, 1) * self.speed, self.rng.uniform(-1, 1) * self.speed
+        me.set_velocity(vx, vy, now)
+
+def player_color(i, count):
+    """依編號平均分配色相"""
+    r, g, b = colorsys.hsv_to_rgb(i / max(count, 1), 0.8, 0.9)
+    return int(r * 255), int(g * 255), int(b * 255)
 
 class Game:
-    def __init__(self):
+    def __init__(self, hands=2, bots=0, size=(800, 600), vertical_range=None, preview_size=(240, 180)):
+        """
+        hands 為以手勢控制的角色數（每隻手一個角色），bots 為電腦角色數
+        兩隻手時依左右手對應玩家，更多隻手時依手在畫面中由左到右的順序對應
+        vertical_range 為攻擊的垂直距離限制（None 表示只看水平距離）
+        preview_size 為視窗右上角攝影機預覽的大小，None 表示不顯示
+        hands 為 0 時（只有電腦角色）不開啟攝影機、不做手部辨識也不顯示預覽
+        """
         pygame.init()
-        self.screen = pygame.display.set_mode((800, 600))
+        self.screen = pygame.display.set_mode(size)
         self.clock = pygame.time.Clock()
         
         # 初始化 MediaPipe
         self.mp_hands = mp.solutions.hands
         self.mp_draw = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(max_num_hands=2)
-        
-        # 初始化攝像頭
-        self.cap = cv2.VideoCapture(0)
+        self.hands = self.tracker = None
+        self.preview_rect = None
+        if hands > 0:
+            self.hands = self.mp_hands.Hands(max_num_hands=hands)
+
+            # 初始化攝像頭（手部辨識在背景執行緒進行）
+            self.tracker = HandTracker(self.hands, 0, preview_size)
+            if preview_size is not None:
+                self.preview_rect = pygame.Rect((size[0] - preview_size[0] - 10, 10), preview_size)
         
         # 初始化 frame
         self.frame = None
         
         # 創建玩家
-        self.player1 = Player(100, 400, 50, 100, (255, 0, 0), True)
-        self.player2 = Player(650, 400, 50, 100, (0, 255, 0), False)
+        bounds = self.screen.get_rect()
+        width, height = size
+        self.humans = [Player(100, 400, 50, 100, (255, 0, 0), True, bounds),
+                       Player(width - 150, 400, 50, 100, (0, 255, 0), False, bounds)][:hands]
+        for i in range(2, hands):
+            x = int((i + 0.5) / hands * (width - 50))
+            self.humans.append(Player(x, 400, 50, 100, player_color(i, hands), i % 2 == 0, bounds))
+        self.player1 = self.humans[0] if self.humans else None
+        self.player2 = self.humans[1] if len(self.humans) > 1 else None
+        self.bots = []
+        for i in range(bots):
+            player = Player(random.randrange(0, width - 50), random.randrange(20, height - 100), 50, 100,
+                            player_color(i, bots), False, bounds)
+            self.bots.append(Bot(player))
+        self.players = self.humans + [bot.player for bot in self.bots]
+        self.grid = SpatialHash(ATTACK_RANGE, vertical_range)
+        self.vertical_range = vertical_range
+        self.renderer = Renderer(self.screen)
 
     def detect_gesture(self, hand_landmarks):
         thumb_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
@@ -121,21 +447,36 @@ class Game:
         else:
             return PlayerState.ATTACK
 
-    def process_hands(self, results, frame):
+    def assign_hands(self, results):
+        """回傳 [(手部關鍵點, 對應的玩家, 是否為左手)]"""
+        if not self.humans:
+            return []  # 沒有手勢控制的角色（--hands 0，只有電腦角色）
+        hands = list(zip(results.multi_hand_landmarks, results.multi_handedness))
+        if len(self.humans) > 2:
+            # 多隻手：依畫面中由左到右的順序對應玩家
+            hands.sort(key=lambda h: h[0].landmark[0].x)
+            return [(landmarks, player, player.is_left_player)
+                    for (landmarks, _), player in zip(hands, self.humans)]
+        assigned = []
+        for hand_landmarks, handedness in hands:
+            # 判斷是左手還是右手
+            is_left = handedness.classification[0].label == "Left"
+            
+            # 根據手的類型更新對應的玩家
+            if (is_left and self.player1.is_left_player) or (not is_left and not self.player1.is_left_player):
+                player = self.player1
+            else:
+                player = self.player2
+            if player is not None:
+                assigned.append((hand_landmarks, player, is_left))
+        return assigned
+
+    def process_hands(self, results, frame, timestamp=None):
         if results.multi_hand_landmarks and results.multi_handedness:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                # 判斷是左手還是右手
-                is_left = handedness.classification[0].label == "Left"
-                
-                # 根據手的類型更新對應的玩家
-                if (is_left and self.player1.is_left_player) or (not is_left and not self.player1.is_left_player):
-                    player = self.player1
-                else:
-                    player = self.player2
-                
+            for hand_landmarks, player, is_left in self.assign_hands(results):
                 # 更新玩家狀態
                 player.state = self.detect_gesture(hand_landmarks)
-                player.update_from_hand(hand_landmarks, is_left)
+                player.update_from_hand(hand_landmarks, is_left, timestamp)
                 
                 # 繪製骨架
                 self.mp_draw.draw_landmarks(
@@ -147,53 +488,83 @@ class Game:
                 )
 
     def run(self):
+        if self.tracker is not None:
+            self.tracker.start()
         running = True
+        seen_version = 0
+        dt = 1 / RENDER_FPS
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_q:
+                    # 按 'q' 鍵退出
+                    running = False
+                elif event.type == pygame.VIDEOEXPOSE:
+                    # 視窗被遮住後重新顯示，需要整個重畫
+                    self.renderer.invalidate()
 
-            # 處理手勢辨識
-            ret, frame = self.cap.read()
-            if ret:
-                frame = cv2.flip(frame, 1)
+            # 取得背景辨識的最新結果（沒有新結果時不等待）
+            if self.tracker is not None:
+                version, timestamp, frame, results = self.tracker.get()
+            else:
+                version = seen_version
+            if version != seen_version:
+                seen_version = version
                 self.frame = frame  # 儲存當前 frame
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(rgb_frame)
                 
                 # 處理手部偵測結果
-                self.process_hands(results, frame)
+                self.process_hands(results, frame, timestamp)
                 
-                # 顯示攝像頭畫面
-                cv2.imshow('Camera Feed', frame)
+                # 在遊戲視窗中顯示攝像頭畫面：Surface 直接使用 NumPy 陣列的記憶體（BGR），不複製
+                if self.preview_rect is not None:
+                    preview = pygame.image.frombuffer(frame, self.preview_rect.size, "BGR")
+                    self.renderer.set_overlay(preview, self.preview_rect)
 
-            # 更新遊戲邏輯
-            self.update_game_logic()
+            # 依經過時間移動玩家並更新遊戲邏輯
+            now = time.perf_counter()
+            for bot in self.bots:
+                bot.update(now, self.grid)
+            for player in self.players:
+                player.update(dt, now)
+            self.update_game_logic(dt)
 
             # 繪製遊戲畫面
-            self.screen.fill((255, 255, 255))
-            self.player1.draw(self.screen)
-            self.player2.draw(self.screen)
-            pygame.display.flip()
+            self.renderer.render(self.players)
             
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                running = False
-            
-            self.clock.tick(60)
+            dt = self.clock.tick(RENDER_FPS) / 1000.0
 
-        self.cap.release()
-        cv2.destroyAllWindows()
+        if self.tracker is not None:
+            self.tracker.release()
         pygame.quit()
 
-    def update_game_logic(self):
-        if self.player1.state == PlayerState.ATTACK and self.player2.state != PlayerState.DEFENSE:
-            if abs(self.player1.rect.x - self.player2.rect.x) < 100:
-                self.player2.health -= 1
-        
-        if self.player2.state == PlayerState.ATTACK and self.player1.state != PlayerState.DEFENSE:
-            if abs(self.player1.rect.x - self.player2.rect.x) < 100:
-                self.player1.health -= 1
+    def update_game_logic(self, dt=1 / REFERENCE_RATE):
+        # 扣血量依經過時間計算，與畫面更新率無關
+        damage = DAMAGE_PER_SECOND * dt
+        # 以空間雜湊找出攻擊距離內的角色，不必兩兩比較
+        self.grid.rebuild(self.players)
+        for attacker in self.players:
+            if attacker.state != PlayerState.ATTACK:
+                continue
+            for target in self.grid.nearby(attacker):
+                if target is attacker or target.state == PlayerState.DEFENSE:
+                    continue
+                if abs(attacker.rect.centerx - target.rect.centerx) >= ATTACK_RANGE:
+                    continue
+                if self.vertical_range and abs(attacker.rect.centery - target.rect.centery) >= self.vertical_range:
+                    continue
+                target.health -= damage
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="手勢對戰遊戲")
+    parser.add_argument("--hands", type=int, default=2, help="以手勢控制的角色數（每隻手一個角色）")
+    parser.add_argument("--bots", type=int, default=0, help="競技場模式：加入 N 個電腦角色")
+    parser.add_argument("--size", type=int, nargs=2, default=[800, 600], metavar=("W", "H"), help="視窗大小")
+    parser.add_argument("--preview", type=int, nargs=2, default=[240, 180], metavar=("W", "H"),
+                        help="攝影機預覽大小（0 0 表示不顯示）")
+    args = parser.parse_args()
+    # 競技場模式（有電腦角色或超過兩隻手）同時限制垂直距離，避免畫面另一端的角色被打到
+    arena = args.bots > 0 or args.hands > 2
+    game = Game(args.hands, args.bots, tuple(args.size), ATTACK_RANGE if arena else None,
+                tuple(args.preview) if all(args.preview) else None)
+    game.run()
@@ -0,0 +1,97 @@
+# 由高到低的推論設定：(相對呼叫端影像大小的縮放比例, model_complexity)
+LEVELS = [
+    (1.0, 1),
+    (0.75, 1),
+    (0.75, 0),
+    (0.5, 0),
+]
+
+
+class AdaptiveController:
+    """
+    依延遲預算自動調整推論設定
+    解析度以呼叫端指定的影像大小為準依比例縮小，不改變長寬比
+    量測每幀處理時間（平滑後），持續超過預算時依序降低解析度 / model_complexity，
+    已經是最低設定時改為隔幀推論；持續低於預算時再逐步恢復
+    """
+
+    def __init__(self, budget_ms=33, levels=LEVELS, max_skip=2, patience=15, smoothing=0.1):
+        self.budget = budget_ms / 1000.0
+        self.levels = levels
+        self.max_skip = max_skip      # 每次推論後最多略過幾幀
+        self.patience = patience      # 連續幾幀超出 / 低於預算才調整
+        self.smoothing = smoothing    # 指數移動平均的權重
+        self.level = 0
+        self.skip = 0
+        self.average = None
+        self.over = 0
+        self.under = 0
+        self.frame_index = 0
+
+    @property
+    def scale(self):
+        return self.levels[self.level][0]
+
+    def size(self, base):
+        """目前設定下的推論影像大小，base 為不縮放時的 (寬, 高)"""
+        if self.scale == 1.0:
+            return tuple(base)
+        # 取偶數，部分編碼與縮放函式對奇數寬高較慢
+        return (max(2, int(base[0] * self.scale) // 2 * 2), max(2, int(base[1] * self.scale) // 2 * 2))
+
+    @property
+    def model_complexity(self):
+        return self.levels[self.level][1]
+
+    def should_infer(self):
+        """本幀是否要做姿勢推論（隔幀推論時部分幀會略過）"""
+        infer = self.frame_index % (self.skip + 1) == 0
+        self.frame_index += 1
+        return infer
+
+    def record(self, seconds):
+        """
+        記錄一幀的處理時間
+        設定有改變時回傳 True，model_complexity 改變時呼叫端需重建 Pose
+        """
+        if self.average is None:
+            self.average = seconds
+        else:
+            self.average += self.smoothing * (seconds - self.average)
+
+        if self.average > self.budget:
+            self.over += 1
+            self.under = 0
+        elif self.average < self.budget * 0.7:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= self.patience:
+            return self._change(-1)
+        # 恢復比降級謹慎，避免在兩個設定之間來回切換
+        if self.under >= self.patience * 4:
+            return self._change(1)
+        return False
+
+    def _change(self, step):
+        self.over = self.under = 0
+        if step < 0:
+            if self.level < len(self.levels) - 1:
+                self.level += 1
+            elif self.skip < self.max_skip:
+                self.skip += 1
+            else:
+                return False
+        else:
+            if self.skip > 0:
+                self.skip -= 1
+            elif self.level > 0:
+                self.level -= 1
+            else:
+                return False
+        self.average = None
+        print(f"調整推論設定：解析度 {self.scale:.0%}，model_complexity={self.model_complexity}，"
+              f"每 {self.skip + 1} 幀推論一次")
+        return True
@@ -0,0 +1,182 @@
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import os
+import time
+import cv2
+from final import process_landmarks
+from frame_source import open_source, fit_size
+from gesture_rules import GestureEvaluator, GROUPS
+from keysched import KeyScheduler, DryRunKeyboard
+from latency import StageTimer
+from pose_pool import LocalPose
+
+PIPELINE_STAGES = ("capture", "resize", "convert", "inference", "classify", "dispatch")
+
+
+class RecordingEvaluator(GestureEvaluator):
+    """記錄每次觸發的動作 (影片時間, 動作名稱)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.actions = []
+
+    def evaluate(self, features, current_time):
+        rule = super().evaluate(features, current_time)
+        if rule is not None:
+            self.actions.append((current_time, rule.name))
+        return rule
+
+
+def parse_size(text):
+    """'640x480' -> (640, 480)，'native' -> None（不縮放）"""
+    if text == "native":
+        return None
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def load_labels(path):
+    """
+    讀取標註的動作時間軸，CSV 每行為「秒數,動作名稱」（動作名稱與 gesture_rules 的規則名稱相同）
+    可以有標題列，# 開頭為註解
+    """
+    labels = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                labels.append((float(row[0]), row[1].strip()))
+            except ValueError:
+                continue  # 標題列
+    return sorted(labels)
+
+
+def match_timeline(actions, labels, tolerance=0.3):
+    """
+    比對觸發的動作與標註：名稱相同且時間差在 tolerance 秒內視為命中（每個標註最多命中一次）
+    回傳 (命中數, 多出的動作數, 漏掉的標註數)
+    """
+    unmatched = list(labels)
+    hits = 0
+    for t, name in actions:
+        best = None
+        for j, (lt, lname) in enumerate(unmatched):
+            if lname == name and abs(lt - t) <= tolerance and (best is None or abs(lt - t) < abs(unmatched[best][0] - t)):
+                best = j
+        if best is not None:
+            unmatched.pop(best)
+            hits += 1
+    return hits, len(actions) - hits, len(unmatched)
+
+
+def run_clip(path, model_complexity, frame_size, detection_confidence, tracking_confidence, groups=GROUPS):
+    """
+    以 final.py 的流程（不繪製）處理一段影片或圖片資料夾，時間使用影片時間，冷卻時間與即時執行時相同
+    回傳 (動作列表, StageTimer, 幀數, 偵測到人的幀數, 處理秒數)
+    """
+    cap = open_source(path)
+    if not cap.isOpened():
+        raise OSError(f"無法開啟影片: {path}")
+    evaluator = RecordingEvaluator(groups=groups)
+    keys = KeyScheduler(DryRunKeyboard(verbose=False))
+    timer = StageTimer(PIPELINE_STAGES)
+    backend = LocalPose(model_complexity=model_complexity,
+                        min_detection_confidence=detection_confidence,
+                        min_tracking_confidence=tracking_confidence)
+    frames = detected = 0
+    start = time.perf_counter()
+    try:
+        # process_landmarks 會印出動作名稱，量測時丟棄
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            while True:
+                timer.start()
+                ret, img = cap.read()
+                if not ret:
+                    break
+                timer.lap("capture")
+                img = fit_size(img, frame_size)
+                timer.lap("resize")
+                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+                timer.lap("convert")
+                backend.submit(img_rgb)
+                timer.lap("inference")
+                for _, frame in backend.results():
+                    if frame is not None:
+                        detected += 1
+                        process_landmarks(frame, cap.timestamp, evaluator, keys, timer=timer)
+                timer.end_frame()
+                frames += 1
+    finally:
+        elapsed = time.perf_counter() - start
+        backend.close()
+        keys.close()
+        cap.release()
+    return evaluator.actions, timer, frames, detected, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="以錄好的影片比較不同推論設定的速度與動作判斷準確度")
+    parser.add_argument("clips", nargs="+", help="影片檔或圖片資料夾；同名的 .labels.csv 為標註的動作時間軸（可省略）")
+    parser.add_argument("--complexity", type=int, nargs="+", default=[0, 1, 2], choices=[0, 1, 2])
+    parser.add_argument("--sizes", nargs="+", default=["520x300", "640x480", "native"],
+                        help="推論影像大小，例如 640x480，native 為影片原始大小")
+    parser.add_argument("--detection-confidence", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--tracking-confidence", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--groups", nargs="+", default=list(GROUPS), choices=GROUPS, help="要啟用的動作模組")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="動作與標註的容許時間差（秒）")
+    parser.add_argument("--output", metavar="PATH", help="把結果寫入檔案（.csv 為 CSV，其他為 JSON lines）")
+    args = parser.parse_args(argv)
+
+    rows = []
+    grid = list(itertools.product(args.complexity, args.sizes, args.detection_confidence, args.tracking_confidence))
+    for clip in args.clips:
+        label_path = os.path.splitext(clip.rstrip(os.sep))[0] + ".labels.csv"
+        labels = load_labels(label_path) if os.path.exists(label_path) else None
+        for complexity, size, det, trk in grid:
+            actions, timer, frames, detected, elapsed = run_clip(clip, complexity, parse_size(size), det, trk,
+                                                                 args.groups)
+            summaries = timer.summaries()
+            row = {
+                "clip": os.path.basename(clip),
+                "complexity": complexity,
+                "size": size,
+                "det_conf": det,
+                "trk_conf": trk,
+                "frames": frames,
+                "fps": frames / elapsed if elapsed > 0 else 0.0,
+                "detect_rate": detected / frames if frames else 0.0,
+                "frame_p95_ms": summaries.get("frame", {}).get("p95_ms", 0.0),
+            }
+            for stage in PIPELINE_STAGES:
+                row[f"{stage}_ms"] = summaries.get(stage, {}).get("mean_ms", 0.0)
+            row["actions"] = len(actions)
+            if labels is not None:
+                hits, extra, missed = match_timeline(actions, labels, args.tolerance)
+                row.update(hits=hits, extra=extra, missed=missed, match=extra == 0 and missed == 0)
+            rows.append(row)
+            accuracy = (f"命中 {row['hits']}/{len(labels)}，多出 {row['extra']}"
+                        if labels is not None else f"{len(actions)} 個動作（無標註）")
+            print(f"{row['clip']} complexity={complexity} {size} det={det} trk={trk}: "
+                  f"{row['fps']:.1f} fps，推論 {row['inference_ms']:.1f} ms，"
+                  f"偵測率 {row['detect_rate']:.0%}，{accuracy}")
+
+    if args.output:
+        fields = list(dict.fromkeys(k for row in rows for k in row))
+        with open(args.output, "w", newline="") as f:
+            if args.output.endswith(".csv"):
+                writer = csv.DictWriter(f, fields)
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow({k: f"{v:.4f}" if isinstance(v, float) else v for k, v in row.items()})
+            else:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import threading
+import time
+from frame_source import open_source
+
+
+class LatestFrameCapture:
+    """
+    背景擷取執行緒
+    只保留最新的一幀（單格環形緩衝），
+    推論太慢時舊的幀直接丟棄並計數
+    src 可為攝影機編號、檔案路徑或 frame_source 的 FrameSource，size / fps 為向攝影機要求的設定
+    """
+
+    def __init__(self, src=0, size=None, fps=None):
+        self.cap = open_source(src, size, fps)
+        self.cond = threading.Condition()
+        self.frame = None
+        self.frame_time = 0.0 # 最新一幀的擷取時間
+        self.timestamp = 0.0  # 最後被取走的幀的擷取時間（time.time()）
+        self.frame_id = 0     # 最新一幀的編號
+        self.read_id = 0      # 最後被取走的幀編號
+        self.dropped = 0      # 尚未被取走就被覆蓋的幀數
+        self.running = False
+        self.thread = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        """啟動背景擷取"""
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._update, daemon=True)
+        self.thread.start()
+        return self
+
+    def _update(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            frame_time = time.time()
+            with self.cond:
+                if not ret:
+                    self.running = False
+                    self.cond.notify_all()
+                    break
+                # 上一幀還沒被推論迴圈取走，視為丟棄
+                if self.frame_id != self.read_id:
+                    self.dropped += 1
+                self.frame = frame
+                self.frame_time = frame_time
+                self.frame_id += 1
+                self.cond.notify_all()
+
+    def read(self, timeout=1.0):
+        """
+        取得最新一幀，沒有新幀時最多等待 timeout 秒；回傳值與 cv2.VideoCapture.read 相同
+        逾時也回傳 (False, None)，此時 running 仍為 True，呼叫端可繼續等待
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.frame_id != self.read_id or not self.running, timeout)
+            if self.frame_id == self.read_id:
+                return False, None
+            self.read_id = self.frame_id
+            self.timestamp = self.frame_time
+            return True, self.frame
+
+    def release(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.cap.release()
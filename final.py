@@ -1,38 +1,36 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 import math
 import time
-from pynput.keyboard import Key, Controller
+import argparse
+import socket
+from capture import LatestFrameCapture
+from frame_source import open_source, fit_size
+from keysched import KeyScheduler, DryRunKeyboard
+from landmark_io import LandmarkRecorder, ReplaySource, array_to_landmark_list
+import gesture_engine as ge
+from gesture_rules import GestureEvaluator, GROUPS, RULES, PLAYER_KEYMAPS, TILT_THRESHOLD, remap_rules
+from latency import StageTimer
+from shutdown import install_stop_event
+from roi import RoiTracker, crop_to_full
+from adaptive import AdaptiveController
+from pose_pool import LocalPose, PosePool
+from multiplayer import PlayerRegions, crop_regions
+from motion_gate import MotionGate
+from landmark_filter import OneEuroFilter
+from pose_daemon import PoseClient, DEFAULT_SOCKET
+from landmark_stream import LandmarkSubscriber, DEFAULT_STREAM
 
-# 初始化 Mediapipe 模組
-mp_pose = mp.solutions.pose
-mp_draw = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
+# 初始化 Mediapipe 模組（第一次繪製時才載入，只接收姿勢推論服務的結果時不必載入 mediapipe）
+mp_pose = mp_draw = mp_drawing_styles = None
 
-# 初始化鍵盤控制器
-keyboard = Controller()
-
-# 設定參數
-TILT_THRESHOLD = 10  # 傾斜角度閾值
-ROTATION_THRESHOLD = 15  # 旋轉角度閾值（度）
-ROTATION_COOLDOWN = 1.0  # 旋轉動作之間的最小間隔時間（秒）
-ACTION_COOLDOWN = 0.2  # 一般動作之間的最小間隔時間（秒）
-
-# 動作狀態追蹤
-last_action_time = time.time()
-current_action = None
-previous_orientation = None
-
-# 用於腿部識別
-previous_left_knee_y = None
-previous_right_knee_y = None
-light_kick_threshold = 0.05  # 左腳輕踢的高度閾值
-heavy_kick_threshold = 0.05  # 右腳重踢的高度閾值
-speed_threshold = 0.02      # 抬高速度閾值
-
-# 初始化攝影機
-cap = cv2.VideoCapture(0)
+def load_mediapipe():
+    global mp_pose, mp_draw, mp_drawing_styles
+    if mp_pose is None:
+        import mediapipe as mp
+        mp_pose = mp.solutions.pose
+        mp_draw = mp.solutions.drawing_utils
+        mp_drawing_styles = mp.solutions.drawing_styles
 
 def calculate_facing_direction(shoulder_left, shoulder_right):
     """判斷面向方向"""
@@ -67,228 +65,477 @@ def process_tilt(tilt_angle, facing):
 
 def calculate_orientation(landmarks):
     """計算身體朝向角度"""
-    left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
+    left_shoulder = landmarks[ge.LEFT_SHOULDER]
+    right_shoulder = landmarks[ge.RIGHT_SHOULDER]
     delta_x = right_shoulder.x - left_shoulder.x
     delta_y = right_shoulder.y - left_shoulder.y
     angle = math.degrees(math.atan2(delta_y, delta_x))
     return angle
 
-# 啟用姿勢偵測
-with mp_pose.Pose(
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5) as pose:
+def create_backend(model_complexity=1, workers=0, frame_size=(640, 480)):
+    """
+    建立姿勢推論後端：workers 為 0 時在本執行緒推論，否則使用多行程 PosePool
+    多行程時 frame_size 為送去推論的最大影像大小，用來配置共享記憶體緩衝格
+    """
+    if workers:
+        if frame_size is None:
+            raise ValueError("多行程推論需要指定影像大小")
+        width, height = frame_size
+        pool = PosePool((height, width, 3), workers, model_complexity=model_complexity)
+        # 等待各 worker 載入 mediapipe，避免開頭的幀因逾時或緩衝格已滿而遺失
+        if not pool.wait_ready():
+            pool.close()
+            raise RuntimeError("推論行程啟動失敗")
+        return pool
+    return LocalPose(model_complexity=model_complexity)
+
+def draw_overlay(img, frame, facing, tilt_angle, x=10):
+    """在影像上顯示面向、傾斜角度並繪製骨架，x 為文字的水平位置"""
+    # 顯示傾斜和面向資訊
+    cv2.putText(img, f"Facing: {facing}", (x, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    cv2.putText(img, f"Tilt: {tilt_angle:.1f}", (x, 60),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
+    # 繪製骨架
+    load_mediapipe()
+    mp_draw.draw_landmarks(
+        img,
+        array_to_landmark_list(frame),
+        mp_pose.POSE_CONNECTIONS,
+        landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style())
+
+def process_landmarks(frame, current_time, evaluator, keys, img=None, timer=None, player=None, x=50,
+                      smoother=None):
+    """
+    依照一幀的 (33, 4) 關鍵點陣列判斷動作並送出按鍵
+    動作由 gesture_rules 的規則表決定，img 為 None 時（例如重播）不繪製文字
+    多人模式以 player 標示玩家編號，x 為動作名稱的水平位置
+    smoother 為 OneEuroFilter 時先對關鍵點濾波（直接修改 frame，繪製的骨架也是濾波後的）
+    回傳 (面向方向, 傾斜角度)
+    """
+    if smoother is not None:
+        smoother(frame, current_time)
+    rule, features = evaluator.update(frame, current_time)
+    if timer is not None:
+        timer.lap("classify")
+    if rule is not None:
+        keys.tap(*rule.keys, hold=rule.hold)
+        print(rule.name if player is None else f"P{player}: {rule.name}")
+    if timer is not None:
+        timer.lap("dispatch")
+    if rule is not None and img is not None:
+        cv2.putText(img, rule.name, (x, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
+
+    facing = "right" if features[ge.FACING] > 0 else "left"
+    return facing, features[ge.TILT]
+
+def run_camera(evaluator, keys, recorder=None, frame_size=(640, 480), window_name='Pose Detection',
+               timer=None, headless=False, roi=None, adaptive=None, workers=0, motion=None,
+               smoother=None, source=0, realtime=False):
+    """
+    從攝影機讀取影像並即時判斷動作，frame_size 為 None 時不縮放
+    headless 時不繪製、不開預覽視窗，以 Ctrl+C / SIGTERM 或在終端機輸入 q 結束
+    roi 為 RoiTracker 時只對上一幀玩家所在的區域做推論
+    adaptive 為 AdaptiveController 時依延遲預算調整解析度、model_complexity 與推論頻率
+    workers 大於 0 時由多個行程同時推論，畫面與判斷依幀號順序進行（會延遲處理中的幀數）
+    motion 為 MotionGate 時畫面幾乎沒有變化的幀略過推論，沿用上一次的關鍵點
+    smoother 為 OneEuroFilter 時判斷動作前先對關鍵點濾波
+    source 為攝影機編號、影片檔、圖片資料夾或 FrameSource；檔案來源逐幀處理，動作時間使用影片時間，
+    realtime 為 True 時依影片 FPS 播放，否則盡快處理
+    """
+    if timer is None:
+        timer = StageTimer()
+    stop = install_stop_event()
+
+    # 初始化影像來源：攝影機直接輸出所需的解析度，並在背景擷取、只保留最新一幀
+    source = open_source(source, frame_size, realtime=realtime)
+    cap = LatestFrameCapture(source) if source.live else source
     if not cap.isOpened():
-        print("無法開啟攝影機")
-        exit()
-    
-    while True:
-        ret, img = cap.read()
-        if not ret:
-            print("無法接收影像幀")
-            break
-        
-        img = cv2.resize(img, (640, 480))
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        results = pose.process(img_rgb)
-
-        current_time = time.time()
-        action_triggered = False  # 用於避免多重觸發
-
-        if results.pose_landmarks:
-            landmarks = results.pose_landmarks.landmark
-            
-            # 取得關鍵點
-            left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER]
-            right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-            left_hip = landmarks[mp_pose.PoseLandmark.LEFT_HIP]
-            right_hip = landmarks[mp_pose.PoseLandmark.RIGHT_HIP]
-            left_wrist = landmarks[mp_pose.PoseLandmark.LEFT_WRIST]
-            right_wrist = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST]
-            left_knee = landmarks[mp_pose.PoseLandmark.LEFT_KNEE]
-            right_knee = landmarks[mp_pose.PoseLandmark.RIGHT_KNEE]
-            
-            # ------------------ Movement Module ------------------
-            # 判斷面向方向
-            facing = calculate_facing_direction(left_shoulder, right_shoulder)
-            
-            # 計算傾斜角度
-            if facing == "right":
-                tilt_angle = calculate_tilt_angle(right_hip, right_shoulder)
-            else:
-                tilt_angle = calculate_tilt_angle(left_hip, left_shoulder)
-            
-            # 處理傾斜並觸發按鍵
-            direction = process_tilt(tilt_angle, facing)
-            if direction and (current_time - last_action_time) > ACTION_COOLDOWN:
-                if direction == "right":
-                    print("Move right")
-                    keyboard.press(Key.right)
-                    time.sleep(0.15)  # 短暫延遲確保按鍵被偵測
-                    keyboard.release(Key.right)
-                elif direction == "left":
-                    print("Move left")
-                    keyboard.press(Key.left)
-                    time.sleep(0.15)  # 短暫延遲確保按鍵被偵測
-                    keyboard.release(Key.left)
-                last_action_time = current_time
-                action_triggered = True
-            
-            # ------------------ Hand Gesture Module ------------------
-            # 優先處理特殊動作
-            # 昇龍拳：當右手高於右肩的 y 軸位置
-            if right_wrist.y < right_shoulder.y - 0.05:  # 增加容錯，減少微小抖動影響
-                if current_action == None and (current_time - last_action_time) > 0.5:
-                    keyboard.press('a')  
-                    keyboard.press('d')
-                    keyboard.press(Key.down)
-                    time.sleep(0.05)  # 短暫延遲，確保所有按鍵被識別
-                    keyboard.release('a')
-                    keyboard.release('d')
-                    keyboard.release(Key.down)  
-                    print("Shoryuken")
-                    current_action = "Shoryuken"
-                    last_action_time = current_time
-                    time.sleep(0.1)
-            
-            # 氣力射出：當左手高於左肩的 y 軸位置
-            elif left_wrist.y < left_shoulder.y:
-                if current_action == None and (current_time - last_action_time) > 0.5:
-                    keyboard.press('a')  
-                    keyboard.press('d')
-                    time.sleep(0.05)  # 短暫延遲，確保所有按鍵被識別
-                    keyboard.release('a')
-                    keyboard.release('d')
-                    print("Ki Blast")
-                    current_action = "Ki Blast"
-                    last_action_time = current_time
-                    time.sleep(0.1)
-            
-            # 輕拳：當右手位置在右肩前方
-            elif right_wrist.x < right_shoulder.x - 0.1:
-                if current_action == None and (current_time - last_action_time) > 0.5:
-                    keyboard.press('a')
-                    time.sleep(0.05)
-                    keyboard.release('a')
-                    print("Light Punch")
-                    current_action = "Light Punch"
-                    last_action_time = current_time
-                    time.sleep(0.1)
-
-            # 重拳：當左手位置在左肩前方
-            elif left_wrist.x > left_shoulder.x + 0.1:
-                if current_action == None and (current_time - last_action_time) > 0.5:
-                    keyboard.press('d')
-                    time.sleep(0.05)
-                    keyboard.release('d')
-                    print("Heavy Punch")
-                    current_action = "Heavy Punch"
-                    last_action_time = current_time
-                    time.sleep(0.1)
-
-            elif current_action != None:
-                current_action = None
-            
-            # ------------------ Leg/Kick Detection Module ------------------
-            # 計算膝蓋的相對高度
-            left_knee_raise = left_hip.y - left_knee.y
-            right_knee_raise = right_hip.y - right_knee.y
-
-            # 計算膝蓋的速度
-            if previous_left_knee_y is not None:
-                left_knee_speed = previous_left_knee_y - left_knee.y
+        print("無法開啟影像來源")
+        return
+    cap.start()
+    # 多行程推論的緩衝格依固定大小配置，不縮放時以來源的實際大小為準（之後的幀也縮放到這個大小）
+    if workers and frame_size is None:
+        frame_size = source.size
+
+    # 啟用姿勢偵測（自動調整時依目前設定的 model_complexity 建立）
+    complexity = adaptive.model_complexity if adaptive is not None else 1
+    backend = create_backend(complexity, workers, frame_size)
+    last_frame = None       # 最近一次判斷的關鍵點（濾波後），用於顯示
+    last_raw = None         # 最近一次偵測到的關鍵點（濾波前），略過推論的幀沿用
+    facing, tilt_angle = None, 0.0
+    pool_dropped = 0        # 推論佇列已滿而丟棄的幀數
+
+    def handle(done):
+        """依幀號順序判斷、錄製並顯示推論完成的幀，回傳是否按下 q"""
+        nonlocal last_frame, last_raw, facing, tilt_angle
+        quit_requested = False
+        for (img, crop_rect, frame_time, inferred), frame in done:
+            current_time = time.time() if frame_time is None else frame_time
+            if inferred:
+                if frame is not None and roi is not None:
+                    roi.to_full(frame, crop_rect)
+                last_raw = None if frame is None else frame.copy()
             else:
-                left_knee_speed = 0
+                # 略過推論的幀沿用上一次的關鍵點，以本幀的時間判斷（按住的姿勢照常依冷卻時間重複觸發）
+                frame = None if last_raw is None else last_raw.copy()
+
+            # 錄製關鍵點（在濾波之前，重播時可再選擇是否濾波，與 run_stream 相同）
+            if recorder is not None:
+                recorder.write(current_time, frame)
+
+            if frame is not None:
+                facing, tilt_angle = process_landmarks(frame, current_time, evaluator, keys,
+                                                       None if headless else img, timer,
+                                                       smoother=smoother)
+            elif smoother is not None:
+                smoother.reset()
+            if inferred and roi is not None:
+                roi.update(frame)
+            last_frame = frame
+
+            # 繪製與顯示（無畫面模式時全部略過）
+            if not headless:
+                if last_frame is not None:
+                    draw_overlay(img, last_frame, facing, tilt_angle)
+                timer.lap("draw")
+
+                # 顯示影像
+                cv2.imshow(window_name, img)
+
+                # 按 'q' 鍵退出
+                key = cv2.waitKey(1) & 0xFF
+                timer.lap("display")
+                if key == ord('q'):
+                    quit_requested = True
+        return quit_requested
+
+    try:
+        ended = False
+        while not stop.is_set():
+            timer.start()
+            ret, img = cap.read()
+            if not ret:
+                if source.live and cap.running:
+                    continue  # 暫時沒有新幀（例如攝影機啟動時調整曝光），擷取仍在進行就繼續等待
+                ended = True
+                print("無法接收影像幀" if source.live else "影像來源已結束")
+                break
+            timer.lap("capture")
+            process_start = time.perf_counter()
+            # 檔案來源使用影片時間，冷卻時間與實際播放時相同；攝影機在判斷時取目前時間
+            frame_time = None if source.live else source.timestamp
+
+            # 自動調整：依延遲預算決定解析度與是否略過本幀推論
+            infer = True
+            size = frame_size
+            if adaptive is not None:
+                size = adaptive.size(frame_size or (img.shape[1], img.shape[0]))
+                infer = adaptive.should_infer()
+
+            img = fit_size(img, size)
+            timer.lap("resize")
+
+            # 動態閘門：玩家靜止時略過推論
+            if infer and motion is not None:
+                infer = motion.should_infer(img)
 
-            if previous_right_knee_y is not None:
-                right_knee_speed = previous_right_knee_y - right_knee.y
+            if infer:
+                img_rgb = cv2.cvtColor(roi.crop(img) if roi is not None else img, cv2.COLOR_BGR2RGB)
+                timer.lap("convert")
+                # 檔案來源等待空出的緩衝格，逐幀處理不丟幀；攝影機來源推論跟不上時丟棄本幀
+                meta = (img, roi.crop_rect if roi is not None else None, frame_time, True)
+                if not backend.submit(img_rgb, meta, block=not source.live):
+                    pool_dropped += 1
+                # 多行程模式時推論在背景進行，此階段包含送出與取回已完成的結果
+                done = list(backend.results())
+                timer.lap("inference")
             else:
-                right_knee_speed = 0
-
-            previous_left_knee_y = left_knee.y
-            previous_right_knee_y = right_knee.y
-
-            # 左腳輕踢判斷
-            if left_knee_raise > light_kick_threshold and left_knee_speed > speed_threshold and not action_triggered:
-                if (current_time - last_action_time) > ACTION_COOLDOWN:
-                    keyboard.press('z')  # 左腳輕踢
-                    time.sleep(0.05)
-                    keyboard.release('z')
-                    print("Left Light Kick")
-                    last_action_time = current_time
-                    action_triggered = True
-                    cv2.putText(img, "Left Light Kick", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-
-            # 右腳重踢判斷
-            if right_knee_raise > heavy_kick_threshold and right_knee_speed > speed_threshold and not action_triggered:
-                if (current_time - last_action_time) > ACTION_COOLDOWN:
-                    keyboard.press('c')  # 右腳重踢
-                    time.sleep(0.05)
-                    keyboard.release('c')
-                    print("Right Heavy Kick")
-                    last_action_time = current_time
-                    action_triggered = True
-                    cv2.putText(img, "Right Heavy Kick", (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA)
-
-            # ------------------ Rotation Detection Module ------------------
-            # 計算身體朝向角度
-            current_orientation = calculate_orientation(landmarks)
-            if previous_orientation is not None:
-                angle_diff = current_orientation - previous_orientation
-                if angle_diff > 180:
-                    angle_diff -= 360
-                elif angle_diff < -180:
-                    angle_diff += 360
-
-                if abs(angle_diff) > ROTATION_THRESHOLD and (current_time - last_action_time) > ROTATION_COOLDOWN and not action_triggered:
-                    if angle_diff > 0:
-                        # Spin Right
-                        keyboard.press('z')
-                        keyboard.press('c')
-                        time.sleep(0.05)
-                        keyboard.release('z')
-                        keyboard.release('c')
-                        print("Spin Right")
-                        cv2.putText(img, "Spin Right", (50, 200), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
-                    else:
-                        # Spin Left
-                        keyboard.press('z')
-                        keyboard.press('c')
-                        time.sleep(0.05)
-                        keyboard.release('z')
-                        keyboard.release('c')
-                        print("Spin Left")
-                        cv2.putText(img, "Spin Left", (50, 200), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
-                    last_action_time = current_time
-                    action_triggered = True
-
-            previous_orientation = current_orientation
-
-            # 重置動作狀態
-            if action_triggered:
-                current_action = None
-
-            # 顯示傾斜和面向資訊
-            cv2.putText(img, f"Facing: {facing}", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            cv2.putText(img, f"Tilt: {tilt_angle:.1f}", (10, 60),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-
-            # 繪製骨架
-            mp_draw.draw_landmarks(
-                img,
-                results.pose_landmarks,
-                mp_pose.POSE_CONNECTIONS,
-                landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style())
-        
-        # 顯示影像
-        cv2.imshow('Pose Detection', img)
-        
-        # 按 'q' 鍵退出
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-# 釋放資源
-cap.release()
-cv2.destroyAllWindows()
+                # 略過推論的幀：先取回處理中的幀，再以上一次的關鍵點判斷並顯示本幀，維持幀的順序
+                done = list(backend.results(block=True))
+                done.append(((img, None, frame_time, False), None))
+
+            quit_requested = handle(done)
+            timer.end_frame()
+            if quit_requested:
+                break
+
+            # 回報處理時間；model_complexity 改變時重建推論後端（處理中的幀先取回處理）
+            if adaptive is not None:
+                if adaptive.record(time.perf_counter() - process_start) and adaptive.model_complexity != complexity:
+                    complexity = adaptive.model_complexity
+                    if handle(list(backend.results(block=True))):
+                        break
+                    backend.close()
+                    backend = create_backend(complexity, workers, frame_size)
+                    if motion is not None:
+                        motion.reset()
+
+        # 影像來源結束時處理完還在推論中的幀
+        if ended:
+            handle(list(backend.results(block=True)))
+    finally:
+        backend.close()
+
+    # 釋放資源
+    cap.release()
+    if not headless:
+        cv2.destroyAllWindows()
+    print(f"丟棄幀數: {cap.dropped}")
+    if workers:
+        print(f"推論佇列已滿而丟棄的幀數: {pool_dropped}")
+    if motion is not None:
+        print(f"畫面靜止而略過推論的幀數: {motion.total_skipped}")
+
+def run_multiplayer(players, keys, groups=GROUPS, frame_size=(640, 480), window_name='Pose Detection',
+                    timer=None, headless=False, detect=False, smooth=False, source=0, realtime=False):
+    """
+    多人模式：畫面分成每位玩家的區域，每個區域交給各自的 Pose（獨立行程）同時推論，
+    每位玩家依 gesture_rules.PLAYER_KEYMAPS 使用自己的一組按鍵
+    detect=True 時以行人偵測找出玩家區域，否則左右等分畫面
+    smooth=True 時每位玩家各自以 OneEuroFilter 對關鍵點濾波
+    source / realtime 與 run_camera 相同
+    """
+    if not 1 <= players <= len(PLAYER_KEYMAPS):
+        raise ValueError(f"玩家數需介於 1 到 {len(PLAYER_KEYMAPS)}")
+    if timer is None:
+        timer = StageTimer()
+    stop = install_stop_event()
+
+    # 初始化影像來源（攝影機在背景擷取，只保留最新一幀）
+    source = open_source(source, frame_size, realtime=realtime)
+    cap = LatestFrameCapture(source) if source.live else source
+    if not cap.isOpened():
+        print("無法開啟影像來源")
+        return
+    cap.start()
+
+    # 每位玩家各自的規則判斷與推論行程；不縮放時緩衝格依來源的實際大小配置（之後的幀也縮放到這個大小）
+    if frame_size is None:
+        frame_size = source.size
+    width, height = frame_size
+    evaluators = [GestureEvaluator(remap_rules(RULES, PLAYER_KEYMAPS[i]), groups) for i in range(players)]
+    pools = [PosePool((height, width, 3), workers=1) for _ in range(players)]
+    # 等待各行程載入 mediapipe，否則開頭幾幀會等不到結果
+    if not all(pool.wait_ready() for pool in pools):
+        for pool in pools:
+            pool.close()
+        cap.release()
+        print("推論行程啟動失敗")
+        return
+    smoothers = [OneEuroFilter() if smooth else None for _ in range(players)]
+    regions = PlayerRegions(players, detect)
+    try:
+        while not stop.is_set():
+            timer.start()
+            ret, img = cap.read()
+            if not ret:
+                if source.live and cap.running:
+                    continue  # 暫時沒有新幀，擷取仍在進行就繼續等待
+                print("無法接收影像幀" if source.live else "影像來源已結束")
+                break
+            timer.lap("capture")
+
+            img = fit_size(img, frame_size)
+            timer.lap("resize")
+
+            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            timer.lap("convert")
+
+            # 各玩家區域同時推論
+            player_regions = regions.update(img)
+            # 每個行程一次只處理一幀，等待本幀的結果，各玩家的結果一定對應同一幀
+            for pool, (crop, crop_rect) in zip(pools, crop_regions(img_rgb, player_regions)):
+                if not pool.submit(crop, crop_rect, block=True):
+                    raise RuntimeError("推論緩衝格已滿")
+            results = []
+            for pool in pools:
+                result = next(pool.results(block=True), None)
+                if result is None:
+                    raise RuntimeError("推論行程沒有傳回結果")
+                results.append(result)
+            timer.lap("inference")
+
+            current_time = time.time() if source.live else source.timestamp
+            for i, (crop_rect, frame) in enumerate(results):
+                if frame is None:
+                    if smoothers[i] is not None:
+                        smoothers[i].reset()
+                    continue
+                crop_to_full(frame, crop_rect)
+                x = player_regions[i][0] + 10
+                facing, tilt_angle = process_landmarks(frame, current_time, evaluators[i], keys,
+                                                       None if headless else img, timer, i + 1, x,
+                                                       smoothers[i])
+                if not headless:
+                    draw_overlay(img, frame, facing, tilt_angle, x)
+
+            # 繪製與顯示（無畫面模式時全部略過）
+            if not headless:
+                for x0, y0, x1, y1 in player_regions:
+                    cv2.rectangle(img, (x0, y0), (x1 - 1, y1 - 1), (255, 255, 0), 1)
+                timer.lap("draw")
+
+                # 顯示影像
+                cv2.imshow(window_name, img)
+
+                # 按 'q' 鍵退出
+                key = cv2.waitKey(1) & 0xFF
+                timer.lap("display")
+                if key == ord('q'):
+                    break
+            timer.end_frame()
+    finally:
+        for pool in pools:
+            pool.close()
+
+    # 釋放資源
+    cap.release()
+    if not headless:
+        cv2.destroyAllWindows()
+    print(f"丟棄幀數: {cap.dropped}")
+
+def run_replay(path, evaluator, keys, realtime=True, timer=None, smoother=None):
+    """從紀錄檔重播關鍵點，不需要攝影機；smoother 可用來比較濾波前後觸發的動作"""
+    source = ReplaySource(path, realtime=realtime)
+    start = time.perf_counter()
+    for current_time, frame in source:
+        if frame is None:
+            if smoother is not None:
+                smoother.reset()
+        else:
+            if timer is not None:
+                timer.start()
+            # 紀錄檔為唯讀的 memmap，濾波時需複製
+            if smoother is not None:
+                frame = frame.copy()
+            process_landmarks(frame, current_time, evaluator, keys, timer=timer, smoother=smoother)
+            if timer is not None:
+                timer.end_frame()
+    elapsed = time.perf_counter() - start
+    if elapsed > 0:
+        print(f"重播 {len(source)} 幀，耗時 {elapsed:.2f} 秒（{len(source) / elapsed:.0f} fps）")
+
+def run_stream(client, evaluator, keys, timer=None, smoother=None, recorder=None):
+    """
+    從常駐的姿勢推論服務（pose_daemon.py）接收關鍵點，不開啟攝影機、不載入 mediapipe，
+    切換遊戲模式時不必重新初始化攝影機與 Pose
+    client 為 PoseClient（Unix socket）或 LandmarkSubscriber（共享記憶體，可多個模組同時訂閱）
+    """
+    stop = install_stop_event()
+    count = 0
+    try:
+        while not stop.is_set():
+            try:
+                item = client.read()
+            except (socket.timeout, TimeoutError):
+                continue
+            if item is None:
+                print("姿勢推論服務已關閉")
+                break
+            current_time, frame = item
+            count += 1
+            if recorder is not None:
+                recorder.write(current_time, frame)
+            if frame is None:
+                if smoother is not None:
+                    smoother.reset()
+                continue
+            if timer is not None:
+                timer.start()
+            process_landmarks(frame, current_time, evaluator, keys, timer=timer, smoother=smoother)
+            if timer is not None:
+                timer.end_frame()
+    finally:
+        client.close()
+    print(f"收到 {count} 幀")
+
+def main(argv=None, groups=GROUPS, frame_size=(640, 480), window_name='Pose Detection'):
+    """
+    控制器進入點
+    groups 選擇要啟用的動作模組，ragamove / ykpunch / wheatkick 只啟用其中一部分
+    """
+    parser = argparse.ArgumentParser(description="體感格鬥遊戲控制器")
+    parser.add_argument("--record", metavar="PATH", help="把每一幀的關鍵點錄製到檔案")
+    parser.add_argument("--source", metavar="SRC",
+                        help="影像來源：攝影機編號（預設 0）、影片檔或圖片資料夾；"
+                             "檔案來源依影片 FPS 播放，加上 --fast 時盡快處理，可用於效能測試")
+    parser.add_argument("--replay", metavar="PATH", help="從紀錄檔重播關鍵點，不開啟攝影機")
+    parser.add_argument("--daemon", nargs="?", const=DEFAULT_SOCKET, metavar="SOCKET",
+                        help="從常駐的姿勢推論服務（python pose_daemon.py）接收關鍵點，啟動只需數毫秒")
+    parser.add_argument("--stream", nargs="?", const=DEFAULT_STREAM, metavar="NAME",
+                        help="訂閱 pose_daemon.py --publish 發布的共享記憶體關鍵點串流，"
+                             "ragamove / ykpunch / wheatkick 可同時執行，共用一次推論")
+    parser.add_argument("--fast", action="store_true", help="重播或讀取影片檔時不等待，盡快執行")
+    parser.add_argument("--dry-run", action="store_true", help="只印出按鍵，不實際送出")
+    parser.add_argument("--headless", action="store_true",
+                        help="不繪製骨架、不開預覽視窗，以 Ctrl+C 或輸入 q 結束")
+    parser.add_argument("--roi", action="store_true",
+                        help="依上一幀骨架位置裁切影像，只對玩家所在區域做推論")
+    parser.add_argument("--budget-ms", type=float, metavar="MS",
+                        help="每幀處理時間預算（毫秒），超過時自動降低解析度 / 模型複雜度或隔幀推論")
+    parser.add_argument("--motion-gate", type=int, nargs="?", const=10, metavar="N",
+                        help="畫面幾乎沒有變化時略過推論並沿用上一次的關鍵點，至少每 N 幀推論一次（預設 10）")
+    parser.add_argument("--smooth", action="store_true",
+                        help="以 One Euro 濾波器平滑關鍵點，減少輕量模型的抖動造成的誤觸發")
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="以 N 個行程同時做姿勢推論（0 表示在主執行緒推論）")
+    parser.add_argument("--players", type=int, default=1, metavar="N",
+                        help="多人模式：N 位玩家，各自在自己的區域由獨立行程推論並使用自己的按鍵")
+    parser.add_argument("--detect-players", action="store_true",
+                        help="多人模式以行人偵測找出玩家區域（預設為左右等分畫面）")
+    parser.add_argument("--latency-dump", metavar="PATH",
+                        help="結束時把各階段延遲統計寫入檔案（.csv 為 CSV，其他為 JSON lines）")
+    args = parser.parse_args(argv)
+    if args.source is not None and (args.replay or args.daemon or args.stream):
+        parser.error("--source 不能與 --replay、--daemon、--stream 同時使用（這些模式不開啟影像來源）")
+    if args.players > 1:
+        # 多人模式每位玩家各自推論，以下選項只適用於單人模式
+        unsupported = [flag for flag, value in (("--record", args.record), ("--roi", args.roi),
+                                                ("--budget-ms", args.budget_ms), ("--workers", args.workers),
+                                                ("--motion-gate", args.motion_gate)) if value]
+        if unsupported:
+            parser.error(f"多人模式（--players）不支援 {', '.join(unsupported)}")
+
+    evaluator = GestureEvaluator(groups=groups)
+    smoother = OneEuroFilter() if args.smooth else None
+    timer = StageTimer()
+    # 初始化鍵盤輸出排程器（按鍵在背景執行緒送出，不阻塞影像迴圈）
+    keys = KeyScheduler(DryRunKeyboard(verbose=True) if args.dry_run else None)
+    try:
+        if args.replay:
+            run_replay(args.replay, evaluator, keys, not args.fast, timer, smoother)
+        elif args.daemon or args.stream:
+            client = PoseClient(args.daemon) if args.daemon else LandmarkSubscriber(args.stream)
+            recorder = LandmarkRecorder(args.record) if args.record else None
+            try:
+                run_stream(client, evaluator, keys, timer, smoother, recorder)
+            finally:
+                if recorder is not None:
+                    recorder.close()
+                    print(f"已錄製 {recorder.count} 幀到 {args.record}")
+        elif args.players > 1:
+            run_multiplayer(args.players, keys, groups, frame_size, window_name, timer, args.headless,
+                            args.detect_players, args.smooth, args.source or 0, not args.fast)
+        else:
+            recorder = LandmarkRecorder(args.record) if args.record else None
+            try:
+                run_camera(evaluator, keys, recorder, frame_size, window_name, timer, args.headless,
+                           RoiTracker() if args.roi else None,
+                           AdaptiveController(args.budget_ms) if args.budget_ms else None,
+                           args.workers,
+                           MotionGate(force_every=args.motion_gate) if args.motion_gate else None,
+                           smoother, args.source or 0, not args.fast)
+            finally:
+                if recorder is not None:
+                    recorder.close()
+                    print(f"已錄製 {recorder.count} 幀到 {args.record}")
+    finally:
+        keys.close()
+        timer.report()
+        if args.latency_dump:
+            timer.dump(args.latency_dump)
+
+if __name__ == "__main__":
+    main()
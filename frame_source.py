@@ -0,0 +1,179 @@
+import glob
+import os
+import sys
+import time
+import cv2
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def fit_size(img, size):
+    """縮放到 size (寬, 高)；size 為 None 或影像已是該大小（例如攝影機已直接輸出）時不縮放"""
+    if size is None or (img.shape[1], img.shape[0]) == tuple(size):
+        return img
+    return cv2.resize(img, tuple(size))
+
+
+class FrameSource:
+    """
+    影像來源的共同介面（與 cv2.VideoCapture 相同的 read / isOpened / release）
+    live 為 True 的來源（攝影機）需要以 LatestFrameCapture 在背景擷取、只保留最新一幀；
+    檔案來源則逐幀處理、不丟幀，可用最快速度跑完整個流程，timestamp 為該幀在影片中的時間（秒）
+    """
+
+    live = False
+    dropped = 0
+
+    def __init__(self, realtime=False):
+        self.fps = 30.0
+        self.size = None      # (寬, 高)
+        self.index = 0        # 已讀取的幀數
+        self.timestamp = 0.0  # 最後一幀的時間
+        self.realtime = realtime
+        self.start_time = None
+
+    def isOpened(self):
+        return True
+
+    def start(self):
+        return self
+
+    def read(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def _pace(self):
+        """realtime 時等到該幀在影片中的時間才送出（依 fps 播放），否則盡快送出"""
+        if not self.realtime:
+            return
+        if self.start_time is None:
+            self.start_time = time.perf_counter() - self.timestamp
+        wait = self.timestamp - (time.perf_counter() - self.start_time)
+        if wait > 0:
+            time.sleep(wait)
+
+    def __iter__(self):
+        while True:
+            ret, img = self.read()
+            if not ret:
+                return
+            yield img
+
+
+class CameraSource(FrameSource):
+    """
+    攝影機（Linux 使用 V4L2）
+    開啟時向攝影機要求 MJPG、指定的解析度與 FPS（由攝影機直接輸出所需大小，不必再 cv2.resize），
+    並把驅動程式的緩衝區設為 1 幀，讀到的永遠是最新的畫面
+    攝影機不支援時使用實際協商到的設定，size / fps 為實際值
+    """
+
+    live = True
+
+    def __init__(self, index=0, size=None, fps=None, fourcc="MJPG"):
+        super().__init__()
+        api = cv2.CAP_V4L2 if sys.platform.startswith("linux") else cv2.CAP_ANY
+        self.cap = cv2.VideoCapture(index, api)
+        if not self.cap.isOpened() and api != cv2.CAP_ANY:
+            self.cap = cv2.VideoCapture(index)
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if size is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        if fps is not None:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if size is not None and self.cap.isOpened() and self.size != tuple(size):
+            print(f"攝影機不支援 {size[0]}x{size[1]}，使用 {self.size[0]}x{self.size[1]}")
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, img = self.cap.read()
+        if ret:
+            self.index += 1
+            self.timestamp = time.time()
+        return ret, img
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """影片檔；realtime=True 時依影片 FPS 送出，否則盡快送出"""
+
+    def __init__(self, path, realtime=False):
+        super().__init__(realtime)
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, img = self.cap.read()
+        if not ret:
+            return ret, img
+        self.timestamp = self.index / self.fps
+        self.index += 1
+        self._pace()
+        return ret, img
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageFolderSource(FrameSource):
+    """資料夾中的圖片（依檔名排序）或單一圖片，每張視為一幀，時間依 fps 計算；realtime 與 VideoFileSource 相同"""
+
+    def __init__(self, path, fps=30.0, realtime=False):
+        super().__init__(realtime)
+        if os.path.isdir(path):
+            self.paths = sorted(p for p in glob.glob(os.path.join(path, "*"))
+                                if p.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            self.paths = [path]
+        self.fps = fps
+        if self.paths:
+            first = cv2.imread(self.paths[0])
+            if first is not None:
+                self.size = (first.shape[1], first.shape[0])
+
+    def isOpened(self):
+        return bool(self.paths) and self.size is not None
+
+    def __len__(self):
+        return len(self.paths)
+
+    def read(self):
+        while self.index < len(self.paths):
+            img = cv2.imread(self.paths[self.index])
+            self.timestamp = self.index / self.fps
+            self.index += 1
+            if img is not None:
+                self._pace()
+                return True, img
+        return False, None
+
+
+def open_source(spec=0, size=None, fps=None, realtime=False):
+    """
+    依 spec 建立影像來源：
+    整數或數字字串 -> 攝影機（size / fps 為向攝影機要求的解析度與 FPS）
+    資料夾或圖片檔 -> ImageFolderSource，其他路徑 -> VideoFileSource
+    已經是 FrameSource 時直接回傳
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec), size, fps)
+    if os.path.isdir(spec) or spec.lower().endswith(IMAGE_EXTENSIONS):
+        return ImageFolderSource(spec, fps or 30.0, realtime)
+    return VideoFileSource(spec, realtime)
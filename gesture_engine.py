@@ -0,0 +1,168 @@
+import sys
+import time
+import numpy as np
+from sliding_window import SlidingWindow, window_velocities
+
+# mediapipe Pose 關鍵點索引（與 mp_pose.PoseLandmark 相同，離線分析時不必載入 mediapipe）
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_KNEE = 25
+RIGHT_KNEE = 26
+
+# 每幀計算出的特徵欄位
+FEATURES = (
+    "facing",               # 面向右為 1，面向左為 -1
+    "tilt",                 # 面向側的軀幹與垂直線夾角（度）
+    "orientation",          # 兩肩連線的角度（度）
+    "orientation_speed",    # 朝向的變化率（度 / 秒，已處理 ±180 換算）
+    "left_knee_raise",      # 左膝高於左髖的量
+    "right_knee_raise",     # 右膝高於右髖的量
+    "left_knee_speed",      # 左膝上升速度（每秒）
+    "right_knee_speed",     # 右膝上升速度（每秒）
+    "right_wrist_above",    # 右手腕高於右肩的量
+    "left_wrist_above",     # 左手腕高於左肩的量
+    "right_wrist_forward",  # 右手腕在右肩前方的量
+    "left_wrist_forward",   # 左手腕在左肩前方的量
+)
+(FACING, TILT, ORIENTATION, ORIENTATION_SPEED,
+ LEFT_KNEE_RAISE, RIGHT_KNEE_RAISE, LEFT_KNEE_SPEED, RIGHT_KNEE_SPEED,
+ RIGHT_WRIST_ABOVE, LEFT_WRIST_ABOVE, RIGHT_WRIST_FORWARD, LEFT_WRIST_FORWARD) = range(len(FEATURES))
+
+# 出拳判斷（欄位順序即優先順序）
+PUNCHES = ("Shoryuken", "Ki Blast", "Light Punch", "Heavy Punch")
+SHORYUKEN, KI_BLAST, LIGHT_PUNCH, HEAVY_PUNCH = range(len(PUNCHES))
+SHORYUKEN_MARGIN = 0.05  # 右手需高於右肩的量，增加容錯
+KI_BLAST_MARGIN = 0.0    # 左手需高於左肩的量
+PUNCH_REACH = 0.1        # 手腕需在肩膀前方的量
+
+MOTION_WINDOW = 0.15     # 計算速度的時間視窗（秒）
+
+
+def orientations(frames):
+    """計算身體朝向角度，frames 為 (幀數, 33, 4)"""
+    ls = frames[:, LEFT_SHOULDER]
+    rs = frames[:, RIGHT_SHOULDER]
+    return np.degrees(np.arctan2(rs[:, 1] - ls[:, 1], rs[:, 0] - ls[:, 0]))
+
+
+def motion_signals(frames):
+    """
+    計算速度用的訊號 (幀數, 3)：朝向（展開成連續角度）、左膝高度、右膝高度（往上為正）
+    """
+    out = np.empty((len(frames), 3))
+    out[:, 0] = np.degrees(np.unwrap(np.radians(orientations(frames))))
+    out[:, 1:] = -frames[:, [LEFT_KNEE, RIGHT_KNEE], 1]
+    return out
+
+
+def compute_features(frames, times=None, window=MOTION_WINDOW):
+    """
+    一次計算整批幀的特徵
+    frames 為 (幀數, 33, 4) 陣列，times 為每幀的時間（秒，省略時視為 30 fps），
+    速度與即時模式的 GestureEngine 相同，以 window 秒的滑動視窗計算（視窗內位移 / 經過時間）
+    回傳 (幀數, len(FEATURES)) 陣列
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    if frames.ndim == 2:
+        frames = frames[None]
+    out = np.empty((len(frames), len(FEATURES)))
+
+    ls = frames[:, LEFT_SHOULDER]
+    rs = frames[:, RIGHT_SHOULDER]
+    lh = frames[:, LEFT_HIP]
+    rh = frames[:, RIGHT_HIP]
+    lw = frames[:, LEFT_WRIST]
+    rw = frames[:, RIGHT_WRIST]
+
+    # 面向方向與面向側的傾斜角度
+    facing_right = rs[:, 2] < ls[:, 2]
+    out[:, FACING] = np.where(facing_right, 1.0, -1.0)
+    hip = np.where(facing_right[:, None], rh, lh)
+    shoulder = np.where(facing_right[:, None], rs, ls)
+    out[:, TILT] = np.degrees(np.arctan2(shoulder[:, 0] - hip[:, 0], -(shoulder[:, 1] - hip[:, 1])))
+
+    # 朝向角度、膝蓋抬高量
+    out[:, ORIENTATION] = orientations(frames)
+    out[:, [LEFT_KNEE_RAISE, RIGHT_KNEE_RAISE]] = (frames[:, [LEFT_HIP, RIGHT_HIP], 1] -
+                                                   frames[:, [LEFT_KNEE, RIGHT_KNEE], 1])
+
+    # 旋轉速度與膝蓋上升速度（單幀時為 0，即時模式由 GestureEngine 以滑動視窗填入）
+    if len(frames) > 1:
+        if times is None:
+            times = np.arange(len(frames)) / 30.0
+        out[:, [ORIENTATION_SPEED, LEFT_KNEE_SPEED, RIGHT_KNEE_SPEED]] = window_velocities(
+            times, motion_signals(frames), window)
+    else:
+        out[:, [ORIENTATION_SPEED, LEFT_KNEE_SPEED, RIGHT_KNEE_SPEED]] = 0.0
+
+    # 手腕相對肩膀的位置
+    out[:, RIGHT_WRIST_ABOVE] = rs[:, 1] - rw[:, 1]
+    out[:, LEFT_WRIST_ABOVE] = ls[:, 1] - lw[:, 1]
+    out[:, RIGHT_WRIST_FORWARD] = rs[:, 0] - rw[:, 0]
+    out[:, LEFT_WRIST_FORWARD] = lw[:, 0] - ls[:, 0]
+    return out
+
+
+def punch_conditions(features):
+    """由特徵判斷各出拳條件是否成立，回傳 (幀數, len(PUNCHES)) 布林陣列"""
+    features = np.atleast_2d(features)
+    out = np.empty((len(features), len(PUNCHES)), dtype=bool)
+    out[:, SHORYUKEN] = features[:, RIGHT_WRIST_ABOVE] > SHORYUKEN_MARGIN
+    out[:, KI_BLAST] = features[:, LEFT_WRIST_ABOVE] > KI_BLAST_MARGIN
+    out[:, LIGHT_PUNCH] = features[:, RIGHT_WRIST_FORWARD] > PUNCH_REACH
+    out[:, HEAVY_PUNCH] = features[:, LEFT_WRIST_FORWARD] > PUNCH_REACH
+    return out
+
+
+class GestureEngine:
+    """
+    即時模式：每次送入一幀（批次大小為 1）
+    速度欄位以最近 window 秒的滑動視窗計算（視窗內位移 / 經過時間），
+    比相鄰兩幀的差穩定，且不受幀率影響
+    """
+
+    def __init__(self, window=MOTION_WINDOW):
+        # 視窗追蹤的訊號，與 motion_signals 相同：朝向（展開成連續角度）、左膝高度、右膝高度（往上為正）
+        self.window = SlidingWindow(3, window)
+        self.signals = np.zeros(3)
+        self.prev_orientation = None
+
+    def update(self, frame, t=None):
+        """frame 為 (33, 4) 陣列，t 為該幀的時間（秒，省略時使用目前時間），回傳該幀的特徵列"""
+        if t is None:
+            t = time.perf_counter()
+        features = compute_features(frame[None])[0]
+        orient = features[ORIENTATION]
+        if self.prev_orientation is not None:
+            self.signals[0] += (orient - self.prev_orientation + 180.0) % 360.0 - 180.0
+        self.prev_orientation = orient
+        self.signals[1] = -frame[LEFT_KNEE, 1]
+        self.signals[2] = -frame[RIGHT_KNEE, 1]
+        self.window.push(t, self.signals)
+        features[[ORIENTATION_SPEED, LEFT_KNEE_SPEED, RIGHT_KNEE_SPEED]] = self.window.velocity()
+        return features
+
+    def reset(self):
+        self.window.reset()
+        self.signals[:] = 0.0
+        self.prev_orientation = None
+
+
+if __name__ == "__main__":
+    # 離線分析：python gesture_engine.py 紀錄檔
+    from landmark_io import load_recording
+
+    recording = load_recording(sys.argv[1])
+    valid = recording["valid"] == 1
+    frames = recording["lm"][valid]
+    start = time.perf_counter()
+    features = compute_features(frames, recording["t"][valid])
+    punches = punch_conditions(features)
+    elapsed = time.perf_counter() - start
+    print(f"{len(frames)} 幀，耗時 {elapsed * 1000:.1f} ms")
+    for i, name in enumerate(PUNCHES):
+        print(f"{name}: {int(punches[:, i].sum())} 幀")
@@ -0,0 +1,132 @@
+from collections import namedtuple
+import numpy as np
+import gesture_engine as ge
+from gesture_engine import GestureEngine
+
+# 一條動作規則
+#   name       動作名稱
+#   group      所屬模組（move / punch / kick / spin），各腳本依模組挑選規則
+#   priority   數字越小越優先，同一幀只觸發一個動作
+#   cooldown   距離上一個動作（任何動作）至少要經過的秒數
+#   keys       要按下的按鍵（長度大於 1 的字串為特殊鍵名稱，如 "right"）
+#   hold       按住的秒數
+#   conditions 所有條件都成立才觸發，每個條件為 (特徵名稱, ">" 或 "<", 閾值)
+#   latch      觸發後需等條件全部解除才能再次觸發同一模組
+Rule = namedtuple("Rule", "name group priority cooldown keys hold conditions latch")
+
+TILT_THRESHOLD = 10        # 傾斜角度閾值
+ROTATION_SPEED_THRESHOLD = 450  # 旋轉速度閾值（度 / 秒，相當於 30 fps 時每幀 15 度）
+ROTATION_COOLDOWN = 1.0    # 旋轉動作之間的最小間隔時間（秒）
+ACTION_COOLDOWN = 0.2      # 一般動作之間的最小間隔時間（秒）
+PUNCH_COOLDOWN = 0.5       # 出拳之間的最小間隔時間（秒）
+KICK_THRESHOLD = 0.05      # 踢腿的膝蓋抬高閾值
+KNEE_SPEED_THRESHOLD = 0.6  # 膝蓋抬高速度閾值（每秒，相當於 30 fps 時每幀 0.02）
+
+RULES = [
+    # 移動：身體前傾 / 後仰
+    Rule("Move right", "move", 0, ACTION_COOLDOWN, ("right",), 0.15,
+         (("tilt", ">", TILT_THRESHOLD),), False),
+    Rule("Move left", "move", 0, ACTION_COOLDOWN, ("left",), 0.15,
+         (("tilt", "<", -TILT_THRESHOLD),), False),
+    # 出拳：昇龍拳 > 氣力射出 > 輕拳 > 重拳
+    Rule("Shoryuken", "punch", 1, PUNCH_COOLDOWN, ("a", "d", "down"), 0.05,
+         (("right_wrist_above", ">", ge.SHORYUKEN_MARGIN),), True),
+    Rule("Ki Blast", "punch", 2, PUNCH_COOLDOWN, ("a", "d"), 0.05,
+         (("left_wrist_above", ">", ge.KI_BLAST_MARGIN),), True),
+    Rule("Light Punch", "punch", 3, PUNCH_COOLDOWN, ("a",), 0.05,
+         (("right_wrist_forward", ">", ge.PUNCH_REACH),), True),
+    Rule("Heavy Punch", "punch", 4, PUNCH_COOLDOWN, ("d",), 0.05,
+         (("left_wrist_forward", ">", ge.PUNCH_REACH),), True),
+    # 踢腿：膝蓋抬高且上升夠快
+    Rule("Left Light Kick", "kick", 5, ACTION_COOLDOWN, ("z",), 0.05,
+         (("left_knee_raise", ">", KICK_THRESHOLD),
+          ("left_knee_speed", ">", KNEE_SPEED_THRESHOLD)), False),
+    Rule("Right Heavy Kick", "kick", 6, ACTION_COOLDOWN, ("c",), 0.05,
+         (("right_knee_raise", ">", KICK_THRESHOLD),
+          ("right_knee_speed", ">", KNEE_SPEED_THRESHOLD)), False),
+    # 回旋：朝向快速轉動
+    Rule("Spin Right", "spin", 7, ROTATION_COOLDOWN, ("z", "c"), 0.05,
+         (("orientation_speed", ">", ROTATION_SPEED_THRESHOLD),), False),
+    Rule("Spin Left", "spin", 8, ROTATION_COOLDOWN, ("z", "c"), 0.05,
+         (("orientation_speed", "<", -ROTATION_SPEED_THRESHOLD),), False),
+]
+
+GROUPS = ("move", "punch", "kick", "spin")
+
+# 多人模式各玩家的按鍵對應：規則表中的按鍵 -> 該玩家實際送出的按鍵
+# 第一位玩家沿用規則表的按鍵
+PLAYER_KEYMAPS = [
+    {},
+    {"right": "l", "left": "j", "down": "k", "a": "u", "d": "o", "z": "n", "c": "m"},
+    {"right": "h", "left": "f", "down": "g", "a": "r", "d": "y", "z": "v", "c": "b"},
+    {"right": "6", "left": "4", "down": "5", "a": "7", "d": "9", "z": "1", "c": "3"},
+]
+
+
+def remap_rules(rules, keymap):
+    """依按鍵對應表替換規則的按鍵，回傳新的規則列表"""
+    return [rule._replace(keys=tuple(keymap.get(k, k) for k in rule.keys)) for rule in rules]
+
+
+class GestureEvaluator:
+    """
+    把規則表編譯成陣列，每幀以固定次數的 NumPy 運算判斷所有規則
+    規則數量增加不會增加 Python 層級的逐條判斷
+    """
+
+    def __init__(self, rules=RULES, groups=None):
+        if groups is not None:
+            rules = [r for r in rules if r.group in groups]
+        self.rules = sorted(rules, key=lambda r: r.priority)
+        self.engine = GestureEngine()
+
+        # 展開所有條件：讀哪個特徵、比較方向、閾值、屬於哪條規則
+        features, signs, thresholds, starts = [], [], [], []
+        for rule in self.rules:
+            starts.append(len(features))
+            for name, op, threshold in rule.conditions:
+                sign = 1.0 if op == ">" else -1.0
+                features.append(ge.FEATURES.index(name))
+                signs.append(sign)
+                thresholds.append(sign * threshold)
+        self.cond_feature = np.array(features, dtype=np.intp)
+        self.cond_sign = np.array(signs)
+        self.cond_threshold = np.array(thresholds)
+        self.rule_start = np.array(starts, dtype=np.intp)
+
+        group_names = sorted({r.group for r in self.rules})
+        self.rule_group = np.array([group_names.index(r.group) for r in self.rules], dtype=np.intp)
+        self.rule_latch = np.array([r.latch for r in self.rules], dtype=bool)
+        self.cooldown = np.array([r.cooldown for r in self.rules])
+        self.latched = np.zeros(len(group_names), dtype=bool)
+        self.last_action_time = 0.0
+
+    def evaluate(self, features, current_time):
+        """依一幀特徵判斷，回傳觸發的規則，沒有觸發時回傳 None"""
+        if not self.rules:
+            return None
+        ready = (current_time - self.last_action_time) > self.cooldown
+        # 全部規則都在冷卻中且沒有待解除的鎖定時，不必判斷條件
+        if not ready.any() and not self.latched.any():
+            return None
+
+        passed = self.cond_sign * features[self.cond_feature] > self.cond_threshold
+        matched = np.logical_and.reduceat(passed, self.rule_start)
+
+        # 模組內沒有任何規則成立時解除鎖定
+        active = np.bincount(self.rule_group, weights=matched, minlength=len(self.latched)) > 0
+        self.latched &= active
+
+        ready &= matched & ~self.latched[self.rule_group]
+        if not ready.any():
+            return None
+        i = int(np.argmax(ready))
+        self.last_action_time = current_time
+        self.latched[:] = False
+        self.latched[self.rule_group[i]] = self.rule_latch[i]
+        return self.rules[i]
+
+    def update(self, frame, current_time):
+        """送入一幀 (33, 4) 關鍵點陣列，回傳 (觸發的規則或 None, 特徵列)"""
+        features = self.engine.update(frame, current_time)
+        return self.evaluate(features, current_time), features
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+from pose_pool import create_pose
+
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+
+
+class HeadLocator:
+    """
+    由粗到細的頭部定位
+    先在大幅縮小的畫面上找人（粗略搜尋），找到後只裁切上一次頭部位置周圍的區域，
+    以較高解析度精細定位；裁切區域內找不到人時回到粗略搜尋
+    精細定位的像素量只和人物大小有關，與螢幕解析度無關
+    """
+
+    def __init__(self, coarse_width=320, fine_size=256, crop_scale=4.0, min_crop=160,
+                 min_visibility=0.5):
+        self.coarse_width = coarse_width    # 粗略搜尋時畫面縮小後的寬度
+        self.fine_size = fine_size          # 精細定位時裁切區域最多縮放到的邊長
+        self.crop_scale = crop_scale        # 裁切邊長為肩寬的幾倍
+        self.min_crop = min_crop            # 裁切邊長下限（像素）
+        self.min_visibility = min_visibility
+        # 粗略搜尋每次都是獨立的畫面，精細定位的裁切區域跟著頭部移動，可沿用追蹤
+        self.coarse_pose = create_pose(model_complexity=0, static_image_mode=True)
+        self.fine_pose = create_pose(model_complexity=1)
+        self.head = None       # 上一次的頭部位置（像素）
+        self.crop_px = None    # 精細定位的裁切邊長（像素）
+
+    def locate(self, frame_rgb):
+        """回傳頭部位置 (x, y)（相對 frame_rgb 的像素座標），找不到時回傳 None"""
+        h, w = frame_rgb.shape[:2]
+        if self.head is not None:
+            head = self._refine(frame_rgb, w, h)
+            if head is not None:
+                return head
+            self.head = None
+        return self._search(frame_rgb, w, h)
+
+    def _search(self, frame_rgb, w, h):
+        scale = min(self.coarse_width / w, 1.0)
+        small = cv2.resize(frame_rgb, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        landmarks = self._landmarks(self.coarse_pose.process(small))
+        if landmarks is None:
+            return None
+        return self._update(landmarks, (0, 0, w, h), w, h)
+
+    def _refine(self, frame_rgb, w, h):
+        half = self.crop_px // 2
+        x0 = int(min(max(self.head[0] - half, 0), max(w - self.crop_px, 0)))
+        y0 = int(min(max(self.head[1] - half, 0), max(h - self.crop_px, 0)))
+        x1, y1 = min(x0 + self.crop_px, w), min(y0 + self.crop_px, h)
+        crop = frame_rgb[y0:y1, x0:x1]
+        if max(crop.shape[:2]) > self.fine_size:
+            s = self.fine_size / max(crop.shape[:2])
+            crop = cv2.resize(crop, (int(crop.shape[1] * s), int(crop.shape[0] * s)), interpolation=cv2.INTER_AREA)
+        landmarks = self._landmarks(self.fine_pose.process(np.ascontiguousarray(crop)))
+        if landmarks is None:
+            return None
+        return self._update(landmarks, (x0, y0, x1 - x0, y1 - y0), w, h)
+
+    def _landmarks(self, results):
+        if not results.pose_landmarks:
+            return None
+        nose = results.pose_landmarks.landmark[NOSE]
+        if nose.visibility < self.min_visibility:
+            return None
+        return results.pose_landmarks.landmark
+
+    def _update(self, landmarks, rect, w, h):
+        """把區域內的正規化座標換算成整張畫面的像素座標，並依肩寬更新裁切大小"""
+        x0, y0, cw, ch = rect
+        to_px = lambda lm: (x0 + lm.x * cw, y0 + lm.y * ch)
+        nose = to_px(landmarks[NOSE])
+        ls, rs = to_px(landmarks[LEFT_SHOULDER]), to_px(landmarks[RIGHT_SHOULDER])
+        shoulder = float(np.hypot(ls[0] - rs[0], ls[1] - rs[1]))
+        self.crop_px = int(min(max(shoulder * self.crop_scale, self.min_crop), w, h))
+        self.head = nose
+        return int(nose[0]), int(nose[1])
+
+    def close(self):
+        self.coarse_pose.close()
+        self.fine_pose.close()
@@ -0,0 +1,100 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class DryRunKeyboard:
+    """不送出按鍵，只印出並記錄，供重播與無螢幕環境測試使用"""
+
+    def __init__(self, verbose=False):
+        self.log = []      # (時間, 動作, 按鍵)
+        self.verbose = verbose
+
+    def press(self, key):
+        self.log.append((time.perf_counter(), "press", key))
+        if self.verbose:
+            print(f"[dry-run] press {key}")
+
+    def release(self, key):
+        self.log.append((time.perf_counter(), "release", key))
+        if self.verbose:
+            print(f"[dry-run] release {key}")
+
+
+class KeyScheduler:
+    """
+    按鍵輸出排程器
+    按下 / 按住 / 放開的指令交給獨立的計時執行緒執行，
+    呼叫端立即返回，影像迴圈不需要 time.sleep
+    """
+
+    def __init__(self, keyboard=None):
+        self.special_keys = None
+        if keyboard is None:
+            from pynput.keyboard import Controller, Key
+            keyboard = Controller()
+            self.special_keys = Key   # 把 "right"、"down" 等名稱轉成 pynput 的特殊鍵
+        self.keyboard = keyboard
+        self.queue = []                   # (執行時間, 序號, 動作, 按鍵)
+        self.counter = itertools.count()  # 同時間的指令依加入順序執行
+        self.held = set()                 # 目前按住的按鍵
+        self.cond = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def press(self, *keys, delay=0.0):
+        """delay 秒後按下按鍵（不放開）"""
+        self._schedule(delay, "press", keys)
+
+    def release(self, *keys, delay=0.0):
+        """delay 秒後放開按鍵"""
+        self._schedule(delay, "release", keys)
+
+    def tap(self, *keys, hold=0.05, delay=0.0):
+        """按下按鍵，按住 hold 秒後放開"""
+        self._schedule(delay, "press", keys)
+        self._schedule(delay + hold, "release", keys)
+
+    def _schedule(self, delay, action, keys):
+        when = time.perf_counter() + delay
+        with self.cond:
+            heapq.heappush(self.queue, (when, next(self.counter), action, keys))
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running:
+                    if self.queue:
+                        wait = self.queue[0][0] - time.perf_counter()
+                        if wait <= 0:
+                            break
+                        self.cond.wait(wait)
+                    else:
+                        self.cond.wait()
+                if not self.running:
+                    return
+                _, _, action, keys = heapq.heappop(self.queue)
+            self._send(action, keys)
+
+    def _send(self, action, keys):
+        for key in keys:
+            if self.special_keys is not None and isinstance(key, str) and len(key) > 1:
+                key = self.special_keys[key]
+            if action == "press":
+                self.keyboard.press(key)
+                self.held.add(key)
+            else:
+                self.keyboard.release(key)
+                self.held.discard(key)
+
+    def close(self):
+        """停止排程並放開所有仍按住的按鍵，避免按鍵卡住"""
+        with self.cond:
+            self.running = False
+            self.queue.clear()
+            self.cond.notify()
+        self.thread.join(timeout=1.0)
+        self._send("release", tuple(self.held))
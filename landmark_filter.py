@@ -0,0 +1,66 @@
+import math
+import numpy as np
+from landmark_io import NUM_LANDMARKS
+
+
+class OneEuroFilter:
+    """
+    One Euro 濾波器，一次處理全部 33 個關鍵點的 x, y, z
+    移動慢時截止頻率低（抑制抖動），移動快時截止頻率隨速度提高（減少延遲）
+    所有運算都是固定大小的陣列運算並重複使用緩衝區，每幀只需數微秒
+    參考：Casiez et al., "1€ Filter", CHI 2012
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=5.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff  # 靜止時的截止頻率（Hz），越小越平滑
+        self.beta = beta              # 截止頻率隨速度提高的比例，越大延遲越小
+        self.d_cutoff = d_cutoff      # 速度本身的截止頻率（Hz）
+        shape = (NUM_LANDMARKS, 3)
+        self.x = np.zeros(shape)      # 上一次濾波後的位置
+        self.dx = np.zeros(shape)     # 上一次濾波後的速度
+        self.raw = np.empty(shape)
+        self.tmp = np.empty(shape)
+        self.alpha = np.empty(shape)
+        self.last_time = None
+
+    def __call__(self, frame, t):
+        """濾波一幀 (33, 4) 關鍵點陣列（直接修改 x, y, z，visibility 不變），回傳同一個陣列"""
+        raw, tmp, alpha = self.raw, self.tmp, self.alpha
+        raw[:] = frame[:, :3]
+        if self.last_time is None:
+            self.x[:] = raw
+            self.dx[:] = 0.0
+            self.last_time = t
+            return frame
+        dt = t - self.last_time
+        if dt <= 0:
+            dt = 1 / 30
+        self.last_time = t
+
+        # 速度：先算原始速度再低通
+        np.subtract(raw, self.x, out=tmp)
+        tmp /= dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.dx += a_d * (tmp - self.dx)
+
+        # 依速度決定每個座標的截止頻率，換算成平滑係數 alpha = 1 / (1 + tau / dt)
+        np.abs(self.dx, out=alpha)
+        alpha *= self.beta
+        alpha += self.min_cutoff
+        alpha *= 2 * math.pi * dt
+        np.divide(alpha, alpha + 1.0, out=alpha)
+
+        np.subtract(raw, self.x, out=tmp)
+        tmp *= alpha
+        self.x += tmp
+        frame[:, :3] = self.x
+        return frame
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        r = 2 * math.pi * cutoff * dt
+        return r / (r + 1.0)
+
+    def reset(self):
+        """玩家離開畫面時重置，下一次偵測到時直接採用新的位置"""
+        self.last_time = None
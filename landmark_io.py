@@ -0,0 +1,117 @@
+import time
+from collections import namedtuple
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# 每幀一筆紀錄：時間戳、是否偵測到人、33 個關鍵點 (x, y, z, visibility)
+FRAME_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("valid", "u1"),
+    ("lm", "<f4", (NUM_LANDMARKS, 4)),
+])
+
+# 檔案開頭的識別碼，紀錄本體緊接在後，可直接 memory-map
+MAGIC = b"LMKREC01"
+
+# 與 mediapipe 關鍵點相同的屬性名稱，重播時可直接代入原本的判斷程式
+Landmark = namedtuple("Landmark", "x y z visibility")
+
+
+def landmarks_to_array(landmarks, out=None):
+    """把 mediapipe 的關鍵點列表轉成 (33, 4) 陣列"""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    for i, lm in enumerate(landmarks):
+        out[i] = (lm.x, lm.y, lm.z, lm.visibility)
+    return out
+
+
+def array_to_landmarks(arr):
+    """把 (33, 4) 陣列轉回可用 .x / .y / .z / .visibility 存取的關鍵點列表"""
+    return [Landmark(*row) for row in arr.tolist()]
+
+
+def array_to_landmark_list(arr):
+    """把 (33, 4) 陣列轉成 mediapipe 的 NormalizedLandmarkList，供 draw_landmarks 使用"""
+    from mediapipe.framework.formats import landmark_pb2
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in arr.tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    return landmark_list
+
+
+class LandmarkRecorder:
+    """把每一幀的 pose_landmarks 寫進二進位紀錄檔"""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.record = np.zeros(1, dtype=FRAME_DTYPE)
+        self.count = 0
+
+    def write(self, t, landmarks):
+        """landmarks 可為 mediapipe 關鍵點列表或 (33, 4) 陣列，None 表示該幀沒有偵測到人"""
+        rec = self.record
+        rec["t"] = t
+        if landmarks is None:
+            rec["valid"] = 0
+            rec["lm"] = 0
+        elif isinstance(landmarks, np.ndarray):
+            rec["valid"] = 1
+            rec["lm"][0] = landmarks
+        else:
+            rec["valid"] = 1
+            landmarks_to_array(landmarks, out=rec["lm"][0])
+        self.file.write(self.record.tobytes())
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_recording(path):
+    """以 memory-map 方式讀取紀錄檔，回傳 FRAME_DTYPE 結構化陣列"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} 不是關鍵點紀錄檔")
+        f.seek(0, 2)
+        size = f.tell() - len(MAGIC)
+    if size < FRAME_DTYPE.itemsize:
+        return np.zeros(0, dtype=FRAME_DTYPE)
+    return np.memmap(path, dtype=FRAME_DTYPE, mode="r", offset=len(MAGIC),
+                     shape=(size // FRAME_DTYPE.itemsize,))
+
+
+class ReplaySource:
+    """
+    從紀錄檔重播關鍵點
+    realtime=True 時依照錄製時的間隔送出，否則盡快送出
+    每次產生 (時間戳, (33, 4) 關鍵點陣列或 None)
+    """
+
+    def __init__(self, path, realtime=True):
+        self.frames = load_recording(path)
+        self.realtime = realtime
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __iter__(self):
+        if len(self.frames) == 0:
+            return
+        t0 = float(self.frames[0]["t"])
+        start = time.perf_counter()
+        for rec in self.frames:
+            t = float(rec["t"])
+            if self.realtime:
+                wait = (t - t0) - (time.perf_counter() - start)
+                if wait > 0:
+                    time.sleep(wait)
+            yield t, (rec["lm"] if rec["valid"] else None)
@@ -0,0 +1,180 @@
+import os
+import time
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from landmark_io import NUM_LANDMARKS
+
+# 預設的共享記憶體名稱
+DEFAULT_STREAM = "pose_landmarks"
+
+RING_MAGIC = b"LMKRING2"
+
+# 共享記憶體開頭的標頭：識別碼、格數、發布端是否已結束、發布端的行程編號、最新一筆的序號（從 1 開始，0 表示還沒有資料）
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("slots", "<u4"),
+    ("closed", "u1"),
+    ("pid", "<u4"),
+    ("write_seq", "<u8"),
+], align=True)
+
+# 每格一筆：序號（寫入中為 0）+ 與 landmark_io.FRAME_DTYPE 相同的欄位
+SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),
+    ("t", "<f8"),
+    ("valid", "u1"),
+    ("lm", "<f4", (NUM_LANDMARKS, 4)),
+], align=True)
+
+
+def _attach(name):
+    """連到既有的共享記憶體，且不讓本行程結束時把它刪掉（由發布端負責刪除）"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13 以上
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _is_live(shm):
+    """既有的共享記憶體是否仍有發布端在使用：格式相符、尚未標記結束，且發布端的行程還在"""
+    if shm.size < HEADER_DTYPE.itemsize:
+        return False
+    header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+    try:
+        if bytes(header["magic"]) != RING_MAGIC or header["closed"]:
+            return False
+        # 發布端異常結束時不會設定 closed，以行程是否存在判斷
+        try:
+            os.kill(int(header["pid"]), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass  # 行程存在，但屬於其他使用者
+        return True
+    finally:
+        del header
+
+
+class LandmarkPublisher:
+    """
+    把每幀的關鍵點寫進共享記憶體環狀緩衝區，任意數量的訂閱端各自讀取
+    推論只在發布端做一次，不受訂閱端數量影響，訂閱端太慢時只會跳過舊的幀，不會拖慢發布端
+    每格寫入前先把序號設為 0、寫完再設為新序號，讀取端前後比對序號即可發現讀到寫到一半的資料
+    """
+
+    def __init__(self, name=DEFAULT_STREAM, slots=64):
+        size = HEADER_DTYPE.itemsize + slots * SLOT_DTYPE.itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 同名的串流仍在發布中時不接手；只清除上一次異常結束留下的共享記憶體
+            old = shared_memory.SharedMemory(name=name)  # 由 unlink 取消登記，不使用 _attach
+            if _is_live(old):
+                # 不是本行程建立的，結束時不可刪除
+                resource_tracker.unregister(old._name, "shared_memory")
+                old.close()
+                raise RuntimeError(f"關鍵點串流 {name} 已有其他發布端（pose_daemon.py --publish）正在使用")
+            old.close()
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = name
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        self.ring = np.ndarray((slots,), dtype=SLOT_DTYPE, buffer=self.shm.buf, offset=HEADER_DTYPE.itemsize)
+        self.ring["seq"] = 0
+        self.header["slots"] = slots
+        self.header["closed"] = 0
+        self.header["pid"] = os.getpid()
+        self.header["write_seq"] = 0
+        self.header["magic"] = RING_MAGIC
+        self.seq = 0
+
+    def publish(self, t, frame):
+        """發布一幀，frame 為 (33, 4) 陣列或 None（該幀沒有偵測到人）"""
+        self.seq += 1
+        ring, i = self.ring, self.seq % len(self.ring)
+        ring["seq"][i] = 0
+        ring["t"][i] = t
+        if frame is None:
+            ring["valid"][i] = 0
+        else:
+            ring["valid"][i] = 1
+            ring["lm"][i] = frame
+        ring["seq"][i] = self.seq
+        self.header["write_seq"] = self.seq
+
+    def close(self):
+        self.header["closed"] = 1
+        del self.header, self.ring
+        self.shm.close()
+        self.shm.unlink()
+
+
+class LandmarkSubscriber:
+    """
+    訂閱 LandmarkPublisher 發布的關鍵點，介面與 pose_daemon.PoseClient 相同：
+    每次產生 (時間戳, (33, 4) 關鍵點陣列或 None)，陣列在下一幀會被覆寫
+    只讀取訂閱之後才發布的幀（不會讀到暫停期間留下的舊資料），落後超過環狀緩衝區長度時跳到最新一幀並計入 dropped
+    """
+
+    def __init__(self, name=DEFAULT_STREAM, timeout=1.0, poll_interval=0.001):
+        try:
+            self.shm = _attach(name)
+        except FileNotFoundError:
+            raise ConnectionError(f"找不到關鍵點串流 {name}（請先執行 python pose_daemon.py --publish）")
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        if bytes(self.header["magic"]) != RING_MAGIC:
+            self.close()
+            raise ConnectionError("關鍵點串流的資料格式不符")
+        slots = int(self.header["slots"])
+        self.ring = np.ndarray((slots,), dtype=SLOT_DTYPE, buffer=self.shm.buf, offset=HEADER_DTYPE.itemsize)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.frame = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+        self.next_seq = int(self.header["write_seq"]) + 1
+        self.dropped = 0
+
+    def read(self):
+        """讀取下一幀，回傳 (時間戳, 關鍵點陣列或 None)；發布端結束時回傳 None，逾時時丟出 TimeoutError"""
+        deadline = time.perf_counter() + self.timeout
+        slots = len(self.ring)
+        while True:
+            latest = int(self.header["write_seq"])
+            if latest >= self.next_seq:
+                if latest - self.next_seq >= slots - 1:
+                    # 落後太多，舊的格子可能已被覆寫
+                    self.dropped += latest - self.next_seq
+                    self.next_seq = latest
+                seq = self.next_seq
+                ring, i = self.ring, seq % slots
+                if ring["seq"][i] == seq:
+                    t = float(ring["t"][i])
+                    valid = bool(ring["valid"][i])
+                    if valid:
+                        self.frame[:] = ring["lm"][i]
+                    if ring["seq"][i] == seq:  # 讀取期間沒有被覆寫
+                        self.next_seq += 1
+                        return t, (self.frame if valid else None)
+                self.dropped += 1
+                self.next_seq += 1
+                continue
+            if self.header["closed"]:
+                return None
+            if time.perf_counter() > deadline:
+                raise TimeoutError
+            time.sleep(self.poll_interval)
+
+    def __iter__(self):
+        while True:
+            try:
+                item = self.read()
+            except TimeoutError:
+                continue
+            if item is None:
+                return
+            yield item
+
+    def close(self):
+        self.header = self.ring = None
+        self.shm.close()
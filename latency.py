@@ -0,0 +1,105 @@
+import csv
+import json
+import math
+import time
+import numpy as np
+
+# final.py 每一幀依序經過的階段
+STAGES = ("capture", "resize", "convert", "inference", "classify", "dispatch", "draw", "display")
+
+
+class LatencyHistogram:
+    """
+    固定大小的延遲直方圖
+    以對數刻度分桶（預設 1 µs ~ 10 s），記憶體用量與樣本數無關
+    """
+
+    def __init__(self, min_seconds=1e-6, max_seconds=10.0, bins=400):
+        self.log_min = math.log(min_seconds)
+        self.log_step = (math.log(max_seconds) - self.log_min) / bins
+        self.bins = bins
+        # 第 0 格為下溢、最後一格為上溢
+        self.counts = np.zeros(bins + 2, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        if seconds > 0:
+            i = int((math.log(seconds) - self.log_min) / self.log_step) + 1
+            i = min(max(i, 0), self.bins + 1)
+        else:
+            i = 0
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """回傳第 p 百分位所在分桶的上界（秒）"""
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(self.count * p / 100.0)
+        i = int(np.searchsorted(np.cumsum(self.counts), max(rank, 1)))
+        return min(math.exp(self.log_min + i * self.log_step), self.max)
+
+    def summary(self):
+        """回傳以毫秒為單位的統計"""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class StageTimer:
+    """
+    逐階段計時
+    每幀呼叫 start()，每個階段結束時呼叫 lap(階段名稱)，最後呼叫 end_frame()
+    """
+
+    def __init__(self, stages=STAGES):
+        self.histograms = {name: LatencyHistogram() for name in stages}
+        self.histograms["frame"] = LatencyHistogram()
+        self.frame_start = self.last = time.perf_counter()
+
+    def start(self):
+        self.frame_start = self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.histograms[stage].add(now - self.last)
+        self.last = now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        self.histograms["frame"].add(now - self.frame_start)
+        self.last = now
+
+    def summaries(self):
+        return {name: h.summary() for name, h in self.histograms.items() if h.count}
+
+    def report(self):
+        """印出各階段的延遲統計"""
+        print(f"{'stage':<10}{'count':>8}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+        for name, s in self.summaries().items():
+            print(f"{name:<10}{s['count']:>8}{s['mean_ms']:>9.2f}{s['p50_ms']:>9.2f}"
+                  f"{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}{s['max_ms']:>9.2f}")
+
+    def dump(self, path):
+        """依副檔名輸出 CSV（.csv）或 JSON lines（其他）"""
+        summaries = self.summaries()
+        with open(path, "w", newline="") as f:
+            if path.endswith(".csv"):
+                writer = csv.writer(f)
+                writer.writerow(["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                for name, s in summaries.items():
+                    writer.writerow([name, s["count"], f"{s['mean_ms']:.4f}", f"{s['p50_ms']:.4f}",
+                                     f"{s['p95_ms']:.4f}", f"{s['p99_ms']:.4f}", f"{s['max_ms']:.4f}"])
+            else:
+                for name, s in summaries.items():
+                    f.write(json.dumps({"stage": name, **s}) + "\n")
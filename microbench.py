@@ -0,0 +1,213 @@
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import types
+import numpy as np
+import gesture_engine as ge
+from landmark_io import NUM_LANDMARKS, array_to_landmarks, Landmark
+
+# 手部關鍵點（與 mp_hands.HandLandmark 相同）
+NUM_HAND_LANDMARKS = 21
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+
+
+def synthetic_frames(count=256, seed=0):
+    """
+    產生 (count, 33, 4) 的合成關鍵點：站立姿勢加上隨機抖動，
+    部分幀前傾 / 後仰、抬膝、出拳、轉身，讓各條件分支都會執行到
+    """
+    rng = np.random.default_rng(seed)
+    base = np.zeros((NUM_LANDMARKS, 4))
+    base[:, 3] = 1.0
+    base[:, :2] = 0.5
+    base[ge.LEFT_SHOULDER, :3] = (0.45, 0.35, 0.05)
+    base[ge.RIGHT_SHOULDER, :3] = (0.55, 0.35, -0.05)
+    base[ge.LEFT_HIP, :2] = (0.47, 0.6)
+    base[ge.RIGHT_HIP, :2] = (0.53, 0.6)
+    base[ge.LEFT_KNEE, :2] = (0.47, 0.8)
+    base[ge.RIGHT_KNEE, :2] = (0.53, 0.8)
+    base[ge.LEFT_WRIST, :2] = (0.45, 0.55)
+    base[ge.RIGHT_WRIST, :2] = (0.55, 0.55)
+
+    frames = np.repeat(base[None], count, axis=0)
+    frames[:, :, :3] += rng.normal(0.0, 0.005, (count, NUM_LANDMARKS, 3))
+    phase = np.arange(count) % 64
+    frames[phase < 8, ge.LEFT_SHOULDER, 0] += 0.08                         # 傾斜
+    frames[phase < 8, ge.RIGHT_SHOULDER, 0] += 0.08
+    frames[(phase >= 16) & (phase < 20), ge.LEFT_KNEE, 1] -= 0.3          # 抬膝
+    frames[(phase >= 32) & (phase < 36), ge.RIGHT_WRIST, 1] -= 0.3        # 昇龍拳
+    frames[(phase >= 40) & (phase < 44), ge.LEFT_WRIST, 0] += 0.2         # 出拳
+    frames[(phase >= 48) & (phase < 52), ge.RIGHT_SHOULDER, 2] += 0.2     # 轉身
+    return frames.astype(np.float32)
+
+
+def synthetic_hands(count=256, seed=0):
+    """產生手部關鍵點（與 mediapipe 結果相同的 .landmark 介面），一半捏合、一半張開"""
+    rng = np.random.default_rng(seed)
+    hands = []
+    for i in range(count):
+        points = rng.random((NUM_HAND_LANDMARKS, 3))
+        if i % 2:
+            points[INDEX_FINGER_TIP] = points[THUMB_TIP] + 0.02
+        hands.append(types.SimpleNamespace(landmark=[Landmark(x, y, z, 1.0) for x, y, z in points.tolist()]))
+    return hands
+
+
+def measure(fn, inputs, repeat=9, min_time=0.2):
+    """
+    回傳 (最短, 中位數) 每次呼叫的平均時間（奈秒）；每輪至少執行 min_time 秒，共 repeat 輪
+    最短值為結果，中位數與最短值的差距為這次量測的雜訊
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            for args in inputs:
+                fn(*args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+    rounds = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            for args in inputs:
+                fn(*args)
+        rounds.append(time.perf_counter() - start)
+    scale = 1e9 / (loops * len(inputs))
+    return min(rounds) * scale, float(np.median(rounds)) * scale
+
+
+def build_cases(frames, hands):
+    """建立 {名稱: (函式, 參數列表)}，缺少的套件（例如沒有 pygame）對應的項目略過"""
+    import final
+    from gesture_rules import GestureEvaluator
+    from keysched import KeyScheduler, DryRunKeyboard
+
+    landmark_lists = [array_to_landmarks(f) for f in frames]
+    ls, rs, lh, rh = ge.LEFT_SHOULDER, ge.RIGHT_SHOULDER, ge.LEFT_HIP, ge.RIGHT_HIP
+    angles = [final.calculate_tilt_angle(lm[rh], lm[rs]) for lm in landmark_lists]
+
+    def helpers_frame(lm):
+        """原本 final.py 每幀以輔助函式判斷的流程：面向 -> 傾斜 -> 方向 -> 朝向"""
+        facing = final.calculate_facing_direction(lm[ls], lm[rs])
+        if facing == "right":
+            tilt = final.calculate_tilt_angle(lm[rh], lm[rs])
+        else:
+            tilt = final.calculate_tilt_angle(lm[lh], lm[ls])
+        final.process_tilt(tilt, facing)
+        return final.calculate_orientation(lm)
+
+    cases = {
+        "calculate_facing_direction": (final.calculate_facing_direction, [(lm[ls], lm[rs]) for lm in landmark_lists]),
+        "calculate_tilt_angle": (final.calculate_tilt_angle, [(lm[rh], lm[rs]) for lm in landmark_lists]),
+        "process_tilt": (final.process_tilt, [(a, "right" if i % 2 else "left") for i, a in enumerate(angles)]),
+        "calculate_orientation": (final.calculate_orientation, [(lm,) for lm in landmark_lists]),
+        "helpers_frame": (helpers_frame, [(lm,) for lm in landmark_lists]),
+    }
+
+    # 完整的每幀判斷：特徵計算 + 規則判斷（時間每幀前進 1/30 秒，冷卻時間與實際執行時相同）
+    evaluator = GestureEvaluator()
+    clock = (i / 30.0 for i in itertools.count())
+    cases["classify_frame"] = (lambda f: evaluator.update(f, next(clock)), [(f,) for f in frames])
+
+    # 再加上送出按鍵（不實際送出）：與 final.process_landmarks 相同
+    keys = KeyScheduler(DryRunKeyboard(verbose=False))
+    process_evaluator = GestureEvaluator()
+    process_clock = (i / 30.0 for i in itertools.count())
+    cases["process_landmarks"] = (
+        lambda f: final.process_landmarks(f, next(process_clock), process_evaluator, keys),
+        [(f,) for f in frames])
+
+    try:
+        import Mudra
+        import mediapipe as mp
+        game = types.SimpleNamespace(mp_hands=mp.solutions.hands)  # detect_gesture 只用到 mp_hands
+        cases["Game.detect_gesture"] = (lambda h: Mudra.Game.detect_gesture(game, h), [(h,) for h in hands])
+    except ImportError as e:
+        print(f"略過 Game.detect_gesture（{e}）")
+    return cases, keys
+
+
+# 每次呼叫處理一整幀的項目，另外顯示每秒幀數
+PER_FRAME = ("helpers_frame", "classify_frame", "process_landmarks")
+
+
+def compare(results, spread, baseline, threshold):
+    """
+    與基準比較，回傳變慢超過 threshold 百分比的項目
+    兩次量測各自的雜訊（中位數與最短值的差距）也計入容許範圍，雜訊內的變化不視為退步
+    """
+    regressions = []
+    for name, ns in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        change = (ns - base) / base * 100
+        noise = spread.get(name, 0.0) + baseline.get("spread", {}).get(name, 0.0)
+        flag = ""
+        if change > threshold + noise:
+            regressions.append(name)
+            flag = "  <-- 變慢"
+        print(f"{name:<28}{base:>12.0f}{ns:>12.0f}{change:>+9.1f}%{noise:>8.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="手勢判斷輔助函式與每幀判斷的效能測試")
+    parser.add_argument("--frames", type=int, default=256, help="合成關鍵點的幀數")
+    parser.add_argument("--repeat", type=int, default=9, help="每個項目量測幾輪（取最快，中位數用來估計雜訊）")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每輪至少執行的秒數")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="只量測指定的項目")
+    parser.add_argument("--save", metavar="PATH", help="把結果存成基準檔（JSON）")
+    parser.add_argument("--baseline", metavar="PATH", help="與基準檔比較")
+    parser.add_argument("--threshold", type=float, default=15.0,
+                        help="比基準慢超過此百分比（再加上兩次量測的雜訊）時視為退步，結束代碼為 1")
+    args = parser.parse_args(argv)
+
+    frames = synthetic_frames(args.frames)
+    hands = synthetic_hands(args.frames)
+    cases, keys = build_cases(frames, hands)
+    results = {}
+    spread = {}   # 雜訊：中位數比最短值慢的百分比
+    try:
+        print(f"{'name':<28}{'ns/call':>12}{'calls/s':>14}{'noise':>9}")
+        # process_landmarks 觸發動作時會印出名稱，量測時丟棄
+        for name, (fn, inputs) in cases.items():
+            if args.only and name not in args.only:
+                continue
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                ns, median = measure(fn, inputs, args.repeat, args.min_time)
+            results[name] = ns
+            spread[name] = (median - ns) / ns * 100
+            unit = "fps" if name in PER_FRAME else ""
+            print(f"{name:<28}{ns:>12.0f}{1e9 / ns:>14,.0f}{spread[name]:>8.1f}% {unit}")
+    finally:
+        keys.close()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "numpy": np.__version__, "results": results, "spread": spread}, f, indent=2)
+        print(f"已儲存基準到 {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\n{'name':<28}{'baseline':>12}{'now':>12}{'change':>10}{'noise':>9}  (ns/call)")
+        regressions = compare(results, spread, baseline, args.threshold)
+        if regressions:
+            print(f"效能退步超過 {args.threshold:.0f}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    以畫面差異判斷是否需要做姿勢推論
+    把影像縮小成灰階小圖，和上一次推論時的小圖比較，變化的像素比例低於門檻時略過推論、沿用上一次的關鍵點
+    和上一次推論的畫面比較（而非上一幀），緩慢的移動累積起來仍會觸發推論；每 force_every 幀一定推論一次
+    """
+
+    def __init__(self, threshold=0.01, pixel_threshold=20, size=(64, 48), force_every=10):
+        self.threshold = threshold              # 變化像素比例超過此值才推論
+        self.pixel_threshold = pixel_threshold  # 灰階差異超過此值（0~255）的像素視為有變化
+        self.size = size                        # 比較用小圖的大小
+        self.force_every = force_every          # 最多連續略過幾幀
+        self.reference = None
+        self.diff = np.empty((size[1], size[0]), dtype=np.uint8)
+        self.skipped = 0
+        self.total_skipped = 0
+
+    def should_infer(self, img):
+        """送入本幀 BGR 影像，回傳是否要做姿勢推論"""
+        gray = cv2.cvtColor(cv2.resize(img, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        if self.reference is not None and self.skipped + 1 < self.force_every:
+            cv2.absdiff(gray, self.reference, dst=self.diff)
+            if np.count_nonzero(self.diff > self.pixel_threshold) < self.threshold * self.diff.size:
+                self.skipped += 1
+                self.total_skipped += 1
+                return False
+        self.reference = gray
+        self.skipped = 0
+        return True
+
+    def reset(self):
+        """下一幀一定推論（例如推論設定改變之後）"""
+        self.reference = None
+        self.skipped = 0
@@ -0,0 +1,58 @@
+import cv2
+import numpy as np
+
+
+def split_regions(width, height, players):
+    """把畫面左右平分成 players 個區域，回傳 [(x0, y0, x1, y1), ...]（像素）"""
+    edges = np.linspace(0, width, players + 1).astype(int)
+    return [(int(edges[i]), 0, int(edges[i + 1]), height) for i in range(players)]
+
+
+class PlayerRegions:
+    """
+    多人模式的玩家區域
+    預設為固定的左右等分；detect=True 時以 OpenCV HOG 行人偵測（在縮小的影像上、每隔幾幀執行）
+    找出每位玩家的位置，偵測到的人數與玩家數相同時才更新區域，玩家依左到右排序
+    """
+
+    def __init__(self, players, detect=False, detect_every=15, detect_width=320, margin=0.2):
+        self.players = players
+        self.detect = detect
+        self.detect_every = detect_every
+        self.detect_width = detect_width
+        self.margin = margin
+        self.regions = None
+        self.frame_index = 0
+        if detect:
+            self.hog = cv2.HOGDescriptor()
+            self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+
+    def update(self, img):
+        """依本幀更新並回傳各玩家的區域"""
+        h, w = img.shape[:2]
+        if self.regions is None:
+            self.regions = split_regions(w, h, self.players)
+        if self.detect and self.frame_index % self.detect_every == 0:
+            boxes = self._detect(img)
+            if len(boxes) == self.players:
+                self.regions = boxes
+        self.frame_index += 1
+        return self.regions
+
+    def _detect(self, img):
+        h, w = img.shape[:2]
+        scale = self.detect_width / w
+        small = cv2.resize(img, (self.detect_width, int(h * scale)))
+        rects, _ = self.hog.detectMultiScale(small, winStride=(8, 8))
+        boxes = []
+        for x, y, bw, bh in sorted(rects.tolist() if len(rects) else [], key=lambda r: r[0] + r[2] / 2):
+            mx, my = bw * self.margin, bh * self.margin
+            boxes.append((max(int((x - mx) / scale), 0), max(int((y - my) / scale), 0),
+                          min(int((x + bw + mx) / scale), w), min(int((y + bh + my) / scale), h)))
+        return boxes
+
+
+def crop_regions(img, regions):
+    """依區域裁切影像，回傳 [(裁切影像, crop_rect), ...]，crop_rect 格式與 roi.crop_to_full 相同"""
+    h, w = img.shape[:2]
+    return [(img[y0:y1, x0:x1], (x0, y0, x1 - x0, y1 - y0, w, h)) for x0, y0, x1, y1 in regions]
@@ -0,0 +1,230 @@
+import argparse
+import os
+import select
+import socket
+import tempfile
+import numpy as np
+from landmark_io import FRAME_DTYPE, MAGIC
+
+# 預設的 Unix socket 路徑
+DEFAULT_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), "pose_daemon.sock")
+
+
+class PoseDaemon:
+    """
+    常駐的姿勢推論服務
+    攝影機與 Pose 只在啟動時初始化一次，之後持續保持開啟；有客戶端連線時每幀推論，
+    並把結果以 landmark_io 紀錄檔相同的格式（MAGIC + 每幀一筆 FRAME_DTYPE）送給所有客戶端
+    沒有客戶端時只保持攝影機擷取，不做推論
+    publish 為串流名稱時同時發布到共享記憶體（landmark_stream），多個控制器可同時訂閱，此時每幀都推論
+    攝影機暫時讀不到畫面時持續等待，擷取中斷時重新開啟，不會因此結束服務
+    src 為攝影機編號、影片檔或圖片資料夾（frame_source.open_source）；攝影機直接以 frame_size 輸出，
+    檔案來源依影片 FPS 播放，播完時結束服務
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, src=0, frame_size=(640, 480), model_complexity=1, publish=None):
+        # 重量級的模組在這裡才載入，客戶端只需要 PoseClient
+        from pose_pool import LocalPose
+        import cv2
+        from frame_source import fit_size
+        self.cv2 = cv2
+        self.fit_size = fit_size
+        # 先建立串流（同名串流已在發布中時在開啟攝影機前就失敗）
+        self.publisher = None
+        if publish:
+            from landmark_stream import LandmarkPublisher
+            self.publisher = LandmarkPublisher(publish)
+        self.path = path
+        self.src = src
+        self.frame_size = frame_size
+        self.cap = self._open()
+        if not self.cap.isOpened():
+            if self.publisher is not None:
+                self.publisher.close()
+            raise RuntimeError("無法開啟影像來源")
+        self.cap.start()
+        self.backend = LocalPose(model_complexity=model_complexity)
+        self.clients = []
+        self.record = np.zeros(1, dtype=FRAME_DTYPE)
+        self.sock = None
+
+    def serve(self, stop):
+        """在 stop（threading.Event）設定前持續服務"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # 上一次異常結束留下的 socket 檔
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen()
+        print(f"姿勢推論服務已啟動: {self.path}")
+        if self.publisher is not None:
+            print(f"發布關鍵點串流: {self.publisher.name}")
+        try:
+            while not stop.is_set():
+                # 沒有客戶端時等待連線（最多 0.5 秒，以便檢查停止旗標），有客戶端時只檢查不等待
+                active = self.clients or self.publisher is not None
+                readable, _, _ = select.select([self.sock], [], [], 0 if active else 0.5)
+                if readable:
+                    self._accept()
+                if not (self.clients or self.publisher is not None):
+                    continue
+
+                ret, img = self.cap.read()
+                if not ret:
+                    if not self.live:
+                        print("影像來源已結束")
+                        break
+                    if not self.cap.running:
+                        # 擷取執行緒已停止（攝影機中斷），重新開啟；單純逾時則繼續等待
+                        self._reopen(stop)
+                    continue
+                current_time = self.cap.timestamp  # 擷取當下的時間（檔案來源為影片時間），不含縮放等處理時間
+                img = self.fit_size(img, self.frame_size)
+                self.backend.submit(self.cv2.cvtColor(img, self.cv2.COLOR_BGR2RGB))
+                for _, frame in self.backend.results():
+                    if self.publisher is not None:
+                        self.publisher.publish(current_time, frame)
+                    if self.clients:
+                        self._broadcast(current_time, frame)
+        finally:
+            self.close()
+
+    def _open(self):
+        """開啟影像來源：攝影機在背景擷取、只保留最新一幀，檔案來源逐幀讀取"""
+        from capture import LatestFrameCapture
+        from frame_source import open_source
+        source = open_source(self.src, self.frame_size, realtime=True)
+        self.live = source.live
+        return LatestFrameCapture(source) if source.live else source
+
+    def _reopen(self, stop, interval=1.0):
+        """攝影機中斷時每隔 interval 秒嘗試重新開啟，直到成功或服務停止"""
+        print("無法接收影像幀，重新開啟攝影機")
+        self.cap.release()
+        while not stop.wait(interval):
+            self.cap = self._open()
+            if self.cap.isOpened():
+                self.cap.start()
+                print("攝影機已重新開啟")
+                return
+            self.cap.release()
+
+    def _accept(self):
+        conn, _ = self.sock.accept()
+        # 客戶端處理太慢時不拖住其他客戶端：送出逾時就中斷該客戶端
+        conn.settimeout(0.1)
+        try:
+            conn.sendall(MAGIC)
+        except OSError:
+            conn.close()
+            return
+        self.clients.append(conn)
+        print(f"客戶端連線（目前 {len(self.clients)} 個）")
+
+    def _broadcast(self, t, frame):
+        rec = self.record
+        rec["t"] = t
+        if frame is None:
+            rec["valid"] = 0
+            rec["lm"] = 0
+        else:
+            rec["valid"] = 1
+            rec["lm"][0] = frame
+        data = rec.tobytes()
+        for conn in list(self.clients):
+            try:
+                conn.sendall(data)
+            except OSError:
+                conn.close()
+                self.clients.remove(conn)
+                print(f"客戶端中斷（目前 {len(self.clients)} 個）")
+
+    def close(self):
+        for conn in self.clients:
+            conn.close()
+        self.clients = []
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self.publisher is not None:
+            self.publisher.close()
+            self.publisher = None
+        self.backend.close()
+        self.cap.release()
+
+
+class PoseClient:
+    """
+    PoseDaemon 的客戶端，介面與 landmark_io.ReplaySource 相同：
+    每次產生 (時間戳, (33, 4) 關鍵點陣列或 None)，陣列在下一幀會被覆寫
+    只依賴 numpy 與標準函式庫，連線只需數毫秒
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=1.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise ConnectionError(f"無法連線到姿勢推論服務 {path}（請先執行 python pose_daemon.py）")
+        self.sock.settimeout(timeout)
+        self.received = 0  # 目前這一筆已收到的位元組數（逾時後從這裡接著收，不會錯位）
+        magic = bytearray(len(MAGIC))
+        try:
+            ok = self._recv_exactly(magic) and bytes(magic) == MAGIC
+        except socket.timeout:
+            ok = False
+        if not ok:
+            self.close()
+            raise ConnectionError("姿勢推論服務的資料格式不符")
+        self.buffer = bytearray(FRAME_DTYPE.itemsize)
+        self.record = np.frombuffer(self.buffer, dtype=FRAME_DTYPE)
+
+    def _recv_exactly(self, buffer):
+        view = memoryview(buffer)
+        while self.received < len(buffer):
+            n = self.sock.recv_into(view[self.received:])
+            if n == 0:
+                return False  # 服務已關閉
+            self.received += n
+        self.received = 0
+        return True
+
+    def read(self):
+        """讀取下一幀，回傳 (時間戳, 關鍵點陣列或 None)；服務關閉時回傳 None，逾時時丟出 socket.timeout"""
+        if not self._recv_exactly(self.buffer):
+            return None
+        rec = self.record[0]
+        return float(rec["t"]), (rec["lm"] if rec["valid"] else None)
+
+    def __iter__(self):
+        while True:
+            try:
+                item = self.read()
+            except socket.timeout:
+                continue
+            if item is None:
+                return
+            yield item
+
+    def close(self):
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    from shutdown import install_stop_event
+    from landmark_stream import DEFAULT_STREAM
+
+    parser = argparse.ArgumentParser(description="常駐的姿勢推論服務（保持攝影機與 Pose 開啟）")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket 路徑")
+    parser.add_argument("--source", "--camera", dest="source", default="0", metavar="SRC",
+                        help="影像來源：攝影機編號、影片檔或圖片資料夾（檔案依影片 FPS 播放）")
+    parser.add_argument("--size", type=int, nargs=2, default=[640, 480], metavar=("W", "H"), help="推論影像大小")
+    parser.add_argument("--complexity", type=int, default=1, choices=[0, 1, 2], help="model_complexity")
+    parser.add_argument("--publish", nargs="?", const=DEFAULT_STREAM, metavar="NAME",
+                        help="同時把關鍵點發布到共享記憶體串流，供多個控制器（final.py --stream）同時訂閱")
+    args = parser.parse_args()
+
+    daemon = PoseDaemon(args.socket, args.source, tuple(args.size), args.complexity, args.publish)
+    daemon.serve(install_stop_event())
@@ -0,0 +1,181 @@
+import multiprocessing
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+from landmark_io import landmarks_to_array
+
+
+def create_pose(model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                static_image_mode=False):
+    """建立 Mediapipe Pose 偵測器"""
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(
+        static_image_mode=static_image_mode,
+        model_complexity=model_complexity,
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence)
+
+
+class LocalPose:
+    """
+    在目前的執行緒直接推論
+    與 PosePool 相同的 submit / results 介面，submit 後結果立即可取
+    """
+
+    def __init__(self, **settings):
+        self.pose = create_pose(**settings)
+        self.done = deque()
+
+    def wait_ready(self, timeout=None):
+        return True
+
+    def submit(self, img_rgb, meta=None, block=False):
+        results = self.pose.process(img_rgb)
+        frame = landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None
+        self.done.append((meta, frame))
+        return True
+
+    def results(self, block=False):
+        """依送入順序取回 (meta, (33, 4) 關鍵點陣列或 None)"""
+        while self.done:
+            yield self.done.popleft()
+
+    def close(self):
+        self.pose.close()
+
+
+def _worker(shm_name, slots, slot_bytes, tasks, done, settings):
+    """worker 行程：持有自己的 Pose，從共享記憶體讀取影像推論"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffer = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=shm.buf)
+    pose = create_pose(**settings)
+    done.put((None, None, None))  # 通知主行程已可開始推論（載入 mediapipe 需要數秒）
+    img = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            frame_id, slot, shape = task
+            img = buffer[slot, :int(np.prod(shape))].reshape(shape)
+            results = pose.process(img)
+            frame = landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None
+            done.put((frame_id, slot, frame))
+    finally:
+        pose.close()
+        del img, buffer
+        shm.close()
+
+
+class PosePool:
+    """
+    多行程姿勢推論
+    影像複製進共享記憶體環形緩衝，由多個各自持有 Pose 的 worker 行程推論，
+    結果依幀號順序取回，可同時有多幀在處理中
+    各 worker 只看到部分幀，Pose 的追蹤狀態以各 worker 看到的幀為準
+    """
+
+    def __init__(self, max_shape=(480, 640, 3), workers=2, slots=None, **settings):
+        slots = slots or workers * 2
+        self.slot_bytes = int(np.prod(max_shape))
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * self.slot_bytes)
+        self.buffer = np.ndarray((slots, self.slot_bytes), dtype=np.uint8, buffer=self.shm.buf)
+        self.free = deque(range(slots))   # 可用的緩衝格
+        self.meta = {}                    # 幀號 -> 呼叫端附帶的資料
+        self.finished = {}                # 已完成但還沒輪到取回的結果
+        self.next_id = 0
+        self.next_out = 0
+        self.ready = 0                    # 已完成初始化的 worker 數
+
+        ctx = multiprocessing.get_context("spawn")
+        self.tasks = ctx.Queue()
+        self.done = ctx.Queue()
+        self.workers = [
+            ctx.Process(target=_worker, daemon=True,
+                        args=(self.shm.name, slots, self.slot_bytes, self.tasks, self.done, settings))
+            for _ in range(workers)
+        ]
+        for w in self.workers:
+            w.start()
+
+    @property
+    def in_flight(self):
+        return self.next_id - self.next_out
+
+    def wait_ready(self, timeout=60.0):
+        """等待所有 worker 載入完成；逾時或 worker 異常結束時回傳 False"""
+        deadline = time.perf_counter() + timeout
+        while self.ready < len(self.workers):
+            if time.perf_counter() > deadline or not self._alive():
+                return False
+            self._collect(block=True)
+        return True
+
+    def _alive(self):
+        return all(w.is_alive() for w in self.workers)
+
+    def submit(self, img_rgb, meta=None, block=False):
+        """
+        把影像送進環形緩衝；沒有空位時回傳 False（呼叫端可丟棄這一幀）
+        block=True 時等待處理中的幀完成、空出緩衝格（檔案來源逐幀處理，不丟幀）
+        """
+        if not self.free:
+            self._collect(block=False)
+            while block and not self.free:
+                if not self._alive():
+                    raise RuntimeError("推論行程已異常結束")
+                self._collect(block=True)
+            if not self.free:
+                return False
+        if img_rgb.nbytes > self.slot_bytes:
+            raise ValueError(f"影像大小 {img_rgb.shape} 超過緩衝格大小")
+        slot = self.free.popleft()
+        np.copyto(self.buffer[slot, :img_rgb.nbytes].reshape(img_rgb.shape), img_rgb)
+        self.meta[self.next_id] = meta
+        self.tasks.put((self.next_id, slot, img_rgb.shape))
+        self.next_id += 1
+        return True
+
+    def _collect(self, block):
+        try:
+            while True:
+                frame_id, slot, frame = self.done.get(block=block, timeout=5.0 if block else None)
+                block = False
+                if frame_id is None:
+                    self.ready += 1
+                    continue
+                self.finished[frame_id] = frame
+                self.free.append(slot)
+        except queue.Empty:
+            pass
+
+    def results(self, block=False):
+        """
+        依幀號順序取回 (meta, (33, 4) 關鍵點陣列或 None)
+        block=True 時等待所有處理中的幀完成（worker 異常結束時丟出 RuntimeError，不會無限等待）
+        """
+        self._collect(block=False)
+        while self.in_flight:
+            while self.next_out not in self.finished:
+                if not block:
+                    return
+                if not self._alive():
+                    raise RuntimeError("推論行程已異常結束")
+                self._collect(block=True)
+            frame = self.finished.pop(self.next_out)
+            meta = self.meta.pop(self.next_out)
+            self.next_out += 1
+            yield meta, frame
+
+    def close(self):
+        for _ in self.workers:
+            self.tasks.put(None)
+        for w in self.workers:
+            w.join(timeout=5.0)
+            if w.is_alive():
+                w.terminate()
+        del self.buffer
+        self.shm.close()
+        self.shm.unlink()
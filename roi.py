@@ -0,0 +1,84 @@
+import numpy as np
+
+
+def crop_to_full(frame, crop_rect):
+    """
+    把裁切區域內的正規化座標換算回整張影像座標（直接修改 (33, 4) 陣列 frame）
+    crop_rect 為 (x0, y0, 裁切寬, 裁切高, 影像寬, 影像高)，單位為像素
+    """
+    x0, y0, cw, ch, w, h = crop_rect
+    if (cw, ch) == (w, h):
+        return frame
+    frame[:, 0] = (frame[:, 0] * cw + x0) / w
+    frame[:, 1] = (frame[:, 1] * ch + y0) / h
+    frame[:, 2] *= cw / w  # z 與 x 使用相同比例
+    return frame
+
+
+class RoiTracker:
+    """
+    追蹤式裁切
+    以上一幀骨架的外框加上邊界裁切下一幀，只對玩家所在區域做姿勢推論，
+    再把關鍵點換算回整張影像的座標；追蹤失敗時回到整張影像
+    """
+
+    def __init__(self, margin=0.25, min_size=0.3, min_visibility=0.5, min_points=8):
+        self.margin = margin                  # 外框四周加上的邊界（相對外框大小）
+        self.min_size = min_size              # 裁切區域最小寬高（相對整張影像）
+        self.min_visibility = min_visibility  # 計算外框時採用的關鍵點可見度下限
+        self.min_points = min_points          # 可見關鍵點少於此數量視為追蹤失敗
+        self.box = None                       # 目前的裁切區域 (x0, y0, x1, y1)，正規化座標
+        self.crop_rect = None                 # 最近一次裁切的像素範圍 (x0, y0, 寬, 高, 影像寬, 影像高)
+
+    def crop(self, img):
+        """依目前的追蹤區域裁切影像，沒有追蹤區域時回傳整張影像"""
+        h, w = img.shape[:2]
+        if self.box is None:
+            self.crop_rect = (0, 0, w, h, w, h)
+            return img
+        x0 = int(self.box[0] * w)
+        y0 = int(self.box[1] * h)
+        x1 = int(np.ceil(self.box[2] * w))
+        y1 = int(np.ceil(self.box[3] * h))
+        self.crop_rect = (x0, y0, x1 - x0, y1 - y0, w, h)
+        return img[y0:y1, x0:x1]
+
+    def to_full(self, frame, crop_rect=None):
+        """
+        把裁切區域內的正規化座標換算回整張影像座標（直接修改 (33, 4) 陣列 frame）
+        多幀同時推論時以 crop_rect 指定該幀裁切時的範圍
+        """
+        return crop_to_full(frame, crop_rect if crop_rect is not None else self.crop_rect)
+
+    def update(self, frame):
+        """
+        以本幀 (33, 4) 關鍵點陣列（整張影像座標）更新追蹤區域
+        frame 為 None 或可見關鍵點太少時視為追蹤失敗
+        """
+        if frame is None:
+            self.box = None
+            return
+        visible = frame[frame[:, 3] >= self.min_visibility]
+        if len(visible) < self.min_points:
+            self.box = None
+            return
+
+        x0, y0 = visible[:, 0].min(), visible[:, 1].min()
+        x1, y1 = visible[:, 0].max(), visible[:, 1].max()
+        mx = max((x1 - x0) * self.margin, (self.min_size - (x1 - x0)) / 2, 0)
+        my = max((y1 - y0) * self.margin, (self.min_size - (y1 - y0)) / 2, 0)
+        target = np.clip([x0 - mx, y0 - my, x1 + mx, y1 + my], 0.0, 1.0)
+        # 關鍵點大多在畫面外時，裁切後的區域會太小甚至是空的，改用整張影像
+        if target[2] - target[0] < self.min_size or target[3] - target[1] < self.min_size:
+            self.box = None
+            return
+
+        # 目前的區域仍完整包住新外框、且沒有大太多時沿用，避免裁切範圍每幀抖動
+        if self.box is not None:
+            inside = (self.box[0] <= x0 and self.box[1] <= y0 and
+                      self.box[2] >= x1 and self.box[3] >= y1)
+            box_area = (self.box[2] - self.box[0]) * (self.box[3] - self.box[1])
+            target_area = (target[2] - target[0]) * (target[3] - target[1])
+            if inside and target_area > box_area * 0.5:
+                return
+        self.box = target
@@ -0,0 +1,262 @@
+import argparse
+import ctypes
+import ctypes.util
+import time
+import cv2
+import numpy as np
+
+
+class ScreenCapture:
+    """
+    螢幕擷取後端的共同介面
+    grab() 回傳原始格式的影像（可能是重複使用的緩衝區，下一次擷取會覆寫），
+    grab_rgb() 轉成 Mediapipe 需要的 RGB 並寫入重複使用的緩衝區
+    """
+
+    channels = "RGB"  # grab() 回傳的通道順序
+
+    def __init__(self, region):
+        self.region = region  # (x, y, 寬, 高)
+        self.rgb = None
+
+    def grab(self):
+        raise NotImplementedError
+
+    def grab_rgb(self):
+        img = self.grab()
+        if self.channels == "RGB":
+            return img
+        if self.rgb is None:
+            self.rgb = np.empty((img.shape[0], img.shape[1], 3), dtype=np.uint8)
+        code = cv2.COLOR_BGRA2RGB if self.channels == "BGRA" else cv2.COLOR_BGR2RGB
+        return cv2.cvtColor(img, code, dst=self.rgb)
+
+    def close(self):
+        pass
+
+
+class _XImage(ctypes.Structure):
+    # 只用到前面的欄位，其餘由 Xlib 管理
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class XShmCapture(ScreenCapture):
+    """
+    X11 MIT-SHM 擷取
+    X server 直接把畫面寫進共享記憶體，NumPy 陣列直接包住同一塊記憶體，不需要額外複製
+    回傳 BGRA（24/32 位元色深的 ZPixmap）
+    """
+
+    channels = "BGRA"
+    Z_PIXMAP = 2
+    IPC_PRIVATE = 0
+    IPC_CREAT = 0o1000
+    IPC_RMID = 0
+
+    def __init__(self, region, display=None):
+        super().__init__(region)
+        x11 = ctypes.CDLL(ctypes.util.find_library("X11") or "libX11.so.6")
+        xext = ctypes.CDLL(ctypes.util.find_library("Xext") or "libXext.so.6")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XRootWindow.restype = ctypes.c_ulong
+        x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XFree.argtypes = [ctypes.c_void_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                         ctypes.c_char_p, ctypes.POINTER(_XShmSegmentInfo),
+                                         ctypes.c_uint, ctypes.c_uint]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+                                      ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+        self.x11, self.xext, self.libc = x11, xext, libc
+
+        self.display = x11.XOpenDisplay(display.encode() if display else None)
+        if not self.display:
+            raise RuntimeError("無法連線到 X server（請確認 DISPLAY）")
+        self.info = _XShmSegmentInfo(shmid=-1)
+        self.image = None
+        self.attached = False
+        self.buffer = None
+        try:
+            self._create_image(region)
+        except BaseException:
+            # 初始化失敗時釋放已取得的資源，避免 create_capture 改用其他後端時殘留
+            self.close()
+            raise
+
+    def _create_image(self, region):
+        x11, xext, libc = self.x11, self.xext, self.libc
+        if not xext.XShmQueryExtension(self.display):
+            raise RuntimeError("X server 不支援 MIT-SHM")
+        screen = x11.XDefaultScreen(self.display)
+        self.root = x11.XRootWindow(self.display, screen)
+        depth = x11.XDefaultDepth(self.display, screen)
+
+        # 超出畫面的範圍會讓 XShmGetImage 產生 BadMatch，Xlib 預設的錯誤處理會直接結束程式，
+        # 因此先檢查，讓 create_capture 可以改用其他後端
+        x, y, width, height = region
+        screen_width = x11.XDisplayWidth(self.display, screen)
+        screen_height = x11.XDisplayHeight(self.display, screen)
+        if x < 0 or y < 0 or width <= 0 or height <= 0 or x + width > screen_width or y + height > screen_height:
+            raise RuntimeError(f"擷取範圍 {region} 超出畫面大小 {screen_width}x{screen_height}")
+        self.image = xext.XShmCreateImage(self.display, x11.XDefaultVisual(self.display, screen), depth,
+                                          self.Z_PIXMAP, None, ctypes.byref(self.info), width, height)
+        if not self.image:
+            self.image = None
+            raise RuntimeError("XShmCreateImage 失敗")
+        if self.image.contents.bits_per_pixel != 32:
+            raise RuntimeError("只支援 32 位元像素的畫面")
+        stride = self.image.contents.bytes_per_line
+        size = stride * height
+        self.info.shmid = libc.shmget(self.IPC_PRIVATE, size, self.IPC_CREAT | 0o600)
+        if self.info.shmid < 0:
+            raise OSError(ctypes.get_errno(), "shmget 失敗")
+        shmaddr = libc.shmat(self.info.shmid, None, 0)
+        if shmaddr in (None, ctypes.c_void_p(-1).value):
+            raise OSError(ctypes.get_errno(), "shmat 失敗")
+        self.info.shmaddr = shmaddr
+        self.info.readOnly = 0
+        self.image.contents.data = self.info.shmaddr
+        xext.XShmAttach(self.display, ctypes.byref(self.info))
+        self.attached = True
+        x11.XSync(self.display, 0)
+        # 標記刪除：所有行程 detach 後自動釋放，程式異常結束也不會殘留
+        libc.shmctl(self.info.shmid, self.IPC_RMID, None)
+
+        raw = (ctypes.c_ubyte * size).from_address(self.info.shmaddr)
+        self.buffer = np.ctypeslib.as_array(raw).reshape(height, stride // 4, 4)[:, :width]
+
+    def grab(self):
+        x, y, _, _ = self.region
+        if not self.xext.XShmGetImage(self.display, self.root, self.image, x, y, 0xFFFFFFFF):
+            raise RuntimeError("XShmGetImage 失敗")
+        return self.buffer
+
+    def close(self):
+        """釋放共享記憶體與 X 連線；初始化到一半失敗時只釋放已取得的部分"""
+        if not self.display:
+            return
+        self.buffer = None
+        if self.attached:
+            self.xext.XShmDetach(self.display, ctypes.byref(self.info))
+            self.x11.XSync(self.display, 0)
+            self.attached = False
+        if self.info.shmaddr:
+            self.libc.shmdt(self.info.shmaddr)
+            self.info.shmaddr = None
+        if self.info.shmid >= 0:
+            # 已標記刪除時再次標記不會有影響
+            self.libc.shmctl(self.info.shmid, self.IPC_RMID, None)
+            self.info.shmid = -1
+        if self.image is not None:
+            self.image.contents.data = None
+            self.x11.XFree(self.image)
+            self.image = None
+        self.x11.XCloseDisplay(self.display)
+        self.display = None
+
+
+class MssCapture(ScreenCapture):
+    """mss 套件擷取（跨平台，需要 pip install mss），回傳 BGRA"""
+
+    channels = "BGRA"
+
+    def __init__(self, region):
+        super().__init__(region)
+        import mss
+        self.sct = mss.mss()
+        x, y, width, height = region
+        self.monitor = {"left": x, "top": y, "width": width, "height": height}
+
+    def grab(self):
+        return np.asarray(self.sct.grab(self.monitor))
+
+    def close(self):
+        self.sct.close()
+
+
+class PyAutoGuiCapture(ScreenCapture):
+    """原本的 pyautogui 擷取（經過 PIL 影像，最慢），回傳 RGB"""
+
+    channels = "RGB"
+
+    def grab(self):
+        import pyautogui
+        return np.asarray(pyautogui.screenshot(region=self.region))
+
+
+BACKENDS = {"xshm": XShmCapture, "mss": MssCapture, "pyautogui": PyAutoGuiCapture}
+
+
+def create_capture(region=(0, 0, 1920, 1080), backend="auto"):
+    """建立螢幕擷取後端；auto 依序嘗試 xshm、mss、pyautogui"""
+    if backend != "auto":
+        return BACKENDS[backend](region)
+    for name, cls in BACKENDS.items():
+        try:
+            capture = cls(region)
+        except (ImportError, OSError, RuntimeError) as e:
+            print(f"螢幕擷取後端 {name} 無法使用: {e}")
+            continue
+        print(f"使用螢幕擷取後端: {name}")
+        return capture
+    raise RuntimeError("沒有可用的螢幕擷取後端")
+
+
+if __name__ == "__main__":
+    # 量測擷取速度，例如在 Xvfb 下：Xvfb :99 -screen 0 1920x1080x24 & DISPLAY=:99 python screen_capture.py
+    parser = argparse.ArgumentParser(description="螢幕擷取速度測試")
+    parser.add_argument("--backend", default="auto", choices=["auto", *BACKENDS])
+    parser.add_argument("--region", type=int, nargs=4, default=[0, 0, 1920, 1080], metavar=("X", "Y", "W", "H"))
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    capture = create_capture(tuple(args.region), args.backend)
+    try:
+        capture.grab_rgb()
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            capture.grab_rgb()
+        elapsed = time.perf_counter() - start
+        print(f"{type(capture).__name__}: {args.frames / elapsed:.1f} fps（含轉換成 RGB）")
+    finally:
+        capture.close()
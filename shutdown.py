@@ -0,0 +1,29 @@
+import signal
+import sys
+import threading
+
+
+def install_stop_event(console=True):
+    """
+    建立停止旗標
+    收到 SIGINT / SIGTERM，或在終端機輸入 q 再按 Enter 時設定，
+    讓沒有預覽視窗（無法用 cv2.waitKey 偵測按鍵）的模式也能正常結束
+    """
+    stop = threading.Event()
+
+    def handler(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGINT, handler)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handler)
+
+    if console and sys.stdin is not None and sys.stdin.isatty():
+        def watch_console():
+            for line in sys.stdin:
+                if line.strip().lower() == "q":
+                    stop.set()
+                    break
+
+        threading.Thread(target=watch_console, daemon=True).start()
+    return stop
@@ -0,0 +1,156 @@
+import numpy as np
+
+
+def window_velocities(times, values, window=0.15):
+    """
+    一次計算整批資料每一筆的視窗速度，起點的選法與 SlidingWindow.push 相同（離線分析與即時模式結果一致）
+    times 為 (筆數,) 遞增的時間（秒），values 為 (筆數, 訊號數)，回傳 (筆數, 訊號數)
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    start = np.maximum(np.searchsorted(times, times - window, side="right") - 1, 0)
+    dt = (times - times[start])[:, None]
+    out = np.zeros_like(values)
+    np.divide(values - values[start], dt, out=out, where=dt > 0)
+    return out
+
+
+class SlidingWindow:
+    """
+    以時間為長度的滑動視窗（固定大小的環狀緩衝區），同時追蹤 size 個訊號
+    維護視窗內的累計和，最大 / 最小值以「雙堆疊佇列」維護：
+    舊的一段存後綴極值，新的一段存累計極值，每幀均攤 O(1)，全部為陣列運算
+    速度 = 視窗內位移 / 經過時間，結果與幀率無關（15 fps 與 60 fps 相同）
+    視窗起點保留最新一筆不晚於 t - window 的資料，幀間隔比視窗長（低幀率、略過推論）時仍以前一幀計算速度
+    """
+
+    def __init__(self, size, window=0.15, capacity=64):
+        self.window = window          # 視窗長度（秒）
+        self.capacity = capacity      # 最多保留的幀數（超過時丟棄最舊的）
+        self.values = np.zeros((capacity, size))
+        self.times = np.zeros(capacity)
+        self.velocities = np.zeros((capacity, size))
+        self.suffix_max = np.zeros((capacity, size))
+        self.suffix_min = np.zeros((capacity, size))
+        self.in_max = np.empty(size)
+        self.in_min = np.empty(size)
+        self.total = np.zeros(size)
+        self.reset()
+
+    def reset(self):
+        # head / mid / tail 為累計的幀號，取餘數後為緩衝區位置
+        # 視窗為 [tail, head)，其中 [tail, mid) 已算好後綴極值，[mid, head) 為新加入的部分
+        self.head = self.mid = self.tail = 0
+        self.total[:] = 0.0
+        self.in_max.fill(-np.inf)
+        self.in_min.fill(np.inf)
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def push(self, t, values):
+        """加入一幀（時間 t 秒、各訊號的值），並移除超出視窗的舊資料"""
+        if self.head > self.tail and t < self.times[(self.head - 1) % self.capacity]:
+            self.reset()  # 時間倒退（例如重新開始重播）
+        if len(self) == self.capacity:
+            self._pop()
+        i = self.head % self.capacity
+        self.values[i] = values
+        self.times[i] = t
+        self.total += self.values[i]
+        np.maximum(self.in_max, self.values[i], out=self.in_max)
+        np.minimum(self.in_min, self.values[i], out=self.in_min)
+        self.head += 1
+        # 下一筆也已超出視窗時才移除最舊的一筆，視窗內至少保留一筆起點
+        while len(self) > 1 and self.times[(self.tail + 1) % self.capacity] <= t - self.window:
+            self._pop()
+
+        j = self.tail % self.capacity
+        dt = t - self.times[j]
+        if dt > 0:
+            np.subtract(self.values[i], self.values[j], out=self.velocities[i])
+            self.velocities[i] /= dt
+        else:
+            self.velocities[i] = 0.0
+
+    def _pop(self):
+        if self.tail == self.mid:
+            self._rebuild()
+        self.total -= self.values[self.tail % self.capacity]
+        self.tail += 1
+
+    def _rebuild(self):
+        """把新加入的部分轉成已算好後綴極值的舊段（每幀最多轉移一次，均攤 O(1)）"""
+        index = np.arange(self.tail, self.head) % self.capacity
+        block = self.values[index][::-1]
+        self.suffix_max[index] = np.maximum.accumulate(block)[::-1]
+        self.suffix_min[index] = np.minimum.accumulate(block)[::-1]
+        self.mid = self.head
+        self.in_max.fill(-np.inf)
+        self.in_min.fill(np.inf)
+
+    @property
+    def duration(self):
+        """視窗內最舊與最新一幀的時間差（秒）"""
+        if not len(self):
+            return 0.0
+        return self.times[(self.head - 1) % self.capacity] - self.times[self.tail % self.capacity]
+
+    def latest(self):
+        return self.values[(self.head - 1) % self.capacity]
+
+    def mean(self):
+        return self.total / max(len(self), 1)
+
+    def max(self):
+        if self.tail < self.mid:
+            return np.maximum(self.in_max, self.suffix_max[self.tail % self.capacity])
+        return self.in_max.copy()
+
+    def min(self):
+        if self.tail < self.mid:
+            return np.minimum(self.in_min, self.suffix_min[self.tail % self.capacity])
+        return self.in_min.copy()
+
+    def peak(self):
+        """視窗內的最大位移（最大值 - 最小值）"""
+        return self.max() - self.min()
+
+    def velocity(self):
+        """視窗內的平均速度（每秒變化量）"""
+        return self.velocities[(self.head - 1) % self.capacity]
+
+    def acceleration(self):
+        """視窗內速度的變化率（每秒平方）"""
+        dt = self.duration
+        if dt <= 0:
+            return np.zeros_like(self.total)
+        newest = self.velocities[(self.head - 1) % self.capacity]
+        return (newest - self.velocities[self.tail % self.capacity]) / dt
+
+
+if __name__ == "__main__":
+    # 自我檢查：等速變化（每秒 10）的訊號在各種幀率下速度都應為 10，與逐筆暴力計算的極值相同
+    for fps in (5, 15, 30, 60):
+        times = np.arange(int(fps * 2)) / fps
+        values = (times * 10.0)[:, None]
+        sw = SlidingWindow(1)
+        for t, v in zip(times, values):
+            sw.push(t, v)
+            assert len(sw) > 1 or t == 0.0
+        assert np.allclose(sw.velocity(), 10.0), (fps, sw.velocity())
+        assert np.allclose(window_velocities(times, values)[1:], 10.0), fps
+        print(f"{fps} fps: velocity={sw.velocity()[0]:.2f}")
+
+    rng = np.random.default_rng(0)
+    times = np.cumsum(rng.uniform(0.005, 0.3, 500))
+    values = rng.normal(size=(500, 2))
+    sw = SlidingWindow(2)
+    batch = window_velocities(times, values)
+    for i, (t, v) in enumerate(zip(times, values)):
+        sw.push(t, v)
+        first = i - len(sw) + 1
+        assert np.allclose(sw.max(), values[first:i + 1].max(axis=0))
+        assert np.allclose(sw.min(), values[first:i + 1].min(axis=0))
+        assert np.allclose(sw.velocity(), batch[i])
+    print("ok")
@@ -1,10 +1,14 @@
+import sys
 import cv2
 import mediapipe as mp
+from frame_source import open_source, fit_size
 mp_drawing = mp.solutions.drawing_utils          # mediapipe 繪圖方法
 mp_drawing_styles = mp.solutions.drawing_styles  # mediapipe 繪圖樣式
 mp_pose = mp.solutions.pose                      # mediapipe 姿勢偵測
 
-cap = cv2.VideoCapture(0)
+# 可指定影片檔或圖片資料夾，例如 python test_posture.py test_imege，預設使用攝影機
+# 攝影機直接要求 520x300，不支援時才縮小
+cap = open_source(sys.argv[1] if len(sys.argv) > 1 else 0, (520, 300))
 
 # 啟用姿勢偵測
 with mp_pose.Pose(
@@ -19,7 +23,7 @@ with mp_pose.Pose(
         if not ret:
             print("Cannot receive frame")
             break
-        img = cv2.resize(img,(520,300))               # 縮小尺寸，加快演算速度
+        img = fit_size(img, (520, 300))               # 縮小尺寸，加快演算速度
         img2 = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)   # 將 BGR 轉換成 RGB
         results = pose.process(img2)                  # 取得姿勢偵測結果
         # 根據姿勢偵測結果，標記身體節點和骨架
@@ -1,44 +1,65 @@
-import cv2
+import argparse
 import pyautogui
 import mediapipe as mp
-import numpy as np
-import time
 import keyboard  # 需要先安裝: pip install keyboard
+from screen_capture import create_capture
+from head_locator import HeadLocator
+
+parser = argparse.ArgumentParser(description="偵測螢幕上的人物頭部並點擊")
+parser.add_argument("--region", type=int, nargs=4, action="append", metavar=("X", "Y", "W", "H"),
+                    help="擷取的螢幕區域，可重複指定多個螢幕或區域（預設為主螢幕 0 0 1920 1080）")
+parser.add_argument("--full-frame", action="store_true",
+                    help="每次都以完整解析度偵測（不使用由粗到細的定位）")
+args = parser.parse_args()
+regions = [tuple(r) for r in args.region] if args.region else [(0, 0, 1920, 1080)]
 
 # 初始化 MediaPipe Pose
 mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
-pose = mp_pose.Pose(
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5)
+
+# 每個區域各自的擷取與定位（X11 下使用共享記憶體擷取，避免經過 PIL 影像）
+captures = [create_capture(region) for region in regions]
+if args.full_frame:
+    poses = [mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) for _ in regions]
+else:
+    locators = [HeadLocator() for _ in regions]
+
+
+def locate_full_frame(i, frame):
+    """原本的作法：對整張畫面做姿勢偵測"""
+    results = poses[i].process(frame)
+    if not results.pose_landmarks:
+        return None
+    nose = results.pose_landmarks.landmark[mp_pose.PoseLandmark.NOSE]
+    return int(nose.x * frame.shape[1]), int(nose.y * frame.shape[0])
+
 
 print("start the game (Press 'q' to quit)")
+last_found = 0  # 先搜尋上一次找到人的區域
 try:
     while True:
         # 檢查是否按下 'q' 鍵
         if keyboard.is_pressed('q'):
             print("Stopping the program...")
             break
-            
-        # 擷取主螢幕的全螢幕畫面
-        screenshot = pyautogui.screenshot(region=(0, 0, 1920, 1080))
-        frame = np.array(screenshot)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-        # 進行姿勢偵測
-        results = pose.process(frame)
+        head = None
+        for i in sorted(range(len(regions)), key=lambda i: i != last_found):
+            # 擷取畫面並轉成 Mediapipe 需要的 RGB
+            frame = captures[i].grab_rgb()
+
+            # 取得頭部位置（使用鼻子作為參考點）
+            head = locate_full_frame(i, frame) if args.full_frame else locators[i].locate(frame)
+            if head is not None:
+                last_found = i
+                head = (regions[i][0] + head[0], regions[i][1] + head[1])
+                break
 
         # 如果偵測到姿勢
-        if results.pose_landmarks:
+        if head is not None:
             print("Person detected")
-            
-            # 取得頭部位置（使用鼻子作為參考點）
-            nose = results.pose_landmarks.landmark[mp_pose.PoseLandmark.NOSE]
-            head_x = int(nose.x * frame.shape[1])
-            head_y = int(nose.y * frame.shape[0])
-            
+
             # 移動滑鼠到頭部位置
-            pyautogui.moveTo(head_x, head_y)
+            pyautogui.moveTo(*head)
             pyautogui.click()
         else:
             print("No person detected")
@@ -47,5 +68,8 @@ except KeyboardInterrupt:
     print("Program interrupted by user")
 finally:
     # 釋放資源
-    pose.close()
-    print("Program ended")
\ No newline at end of file
+    for capture in captures:
+        capture.close()
+    for p in (poses if args.full_frame else locators):
+        p.close()
+    print("Program ended")